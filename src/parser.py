@@ -3,13 +3,49 @@
 PUML -> Quarkus generator
 """
 
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+import codecs
+import ctypes
+import ctypes.util
+import hashlib
+import io
+import json
+import keyword
+import marshal
+import math
+import mmap
+import os
 import re
+import select
+import socketserver
+import stat
+import string
+import struct
 import sys
+import tarfile
+import tempfile
 import textwrap
-from typing import Dict, List
+import threading
+import time
+import zipfile
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple, get_args, get_origin
 import random
 
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
+
+try:
+    import numpy
+except ImportError:  # seed data falls back to the stdlib
+    numpy = None
+
 
 # ------------------ Utility functions ------------------
 
@@ -23,14 +59,9 @@ def to_snake(s: str) -> str:
     return re.sub(r'(?<!^)(?=[A-Z])', '_', s).lower()
 
 
-def ensure_templates_dir(base: Path) -> Path:
-    tpl_dir = base / 'templates'
-    tpl_dir.mkdir(exist_ok=True)
-    return tpl_dir
-
 # ------------------ Default templates ------------------
 
-DEFAULT_ENTITY_TPL = '''
+DEFAULT_ENTITY_TPL = '''\
 package {package}.entities;
 
 import jakarta.persistence.*;
@@ -48,10 +79,9 @@ public class {ClassName} {{
 
     {getters_setters}
 
-}}
-'''
+}}'''
 
-DEFAULT_REPO_TPL = '''
+DEFAULT_REPO_TPL = '''\
 package {pkg}.repositories;
 
 import jakarta.enterprise.context.ApplicationScoped;
@@ -96,7 +126,7 @@ public class {entity}Repository {{
 }}
 '''
 
-DEFAULT_RESOURCE_TPL = '''
+DEFAULT_RESOURCE_TPL = '''\
 package {package}.resources;
 
 import jakarta.inject.Inject;
@@ -148,10 +178,9 @@ public class {Entity}Resource {{
         return Response.ok().build();
     }}
 }}
-
 '''
 
-DEFAULT_POM_TPL = '''
+DEFAULT_POM_TPL = '''\
 <?xml version="1.0" encoding="UTF-8"?>
 <project xmlns="http://maven.apache.org/POM/4.0.0"
          xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
@@ -269,14 +298,13 @@ DEFAULT_POM_TPL = '''
 </project>
 '''
 
-DEFAULT_APP_TPL = '''
+DEFAULT_APP_TPL = '''\
 # replace values !!!!!!!
 quarkus.datasource.db-kind=postgresql
 quarkus.datasource.devservices.port=5320
-quarkus.http.port=8080
-'''
+quarkus.http.port=8080'''
 
-DEFAULT_README = '''
+DEFAULT_README = '''\
 Generated Quarkus JPA project (from PUML)
 
 How to build:
@@ -288,71 +316,348 @@ Run dev mode:
 Edit src/main/resources/application.properties to configure Postgres.
 '''
 
-# ------------------ Parser (simple, robust) ------------------
+# Per-field and per-relation fragments of the entity. Files under
+# templates/partials/ override them; a file's final newline is not part of
+# the partial.
+DEFAULT_PARTIALS = {
+    'id_field': '''    @Id
+    @GeneratedValue
+    private Long id;''',
+
+    'field': '''    private {type} {name};''',
+
+    'id_accessors': '''
+public Long getId() {{ return id; }}
+public void setId(Long id) {{ this.id = id; }}
+''',
+
+    'accessors': '''
+public {type} get{cap}() {{ return {name}; }}
+public void set{cap}({type} {name}) {{ this.{name} = {name}; }}
+''',
+
+    'relation': '''{% if type == "OneToMany" %}
+
+@JsonIgnore
+@OneToMany(mappedBy = "{mapped_by}")
+private Set<{target}> {name} = new HashSet<>();
+{% elif type == "ManyToOne" %}
+
+@JsonIgnore
+@ManyToOne
+@JoinColumn(name = "{join_column}")
+private {target} {name};
+{% elif type == "ManyToMany" %}
+{% if join_table %}
+
+@JsonIgnore
+@ManyToMany
+@JoinTable(
+    name = "{join_table.name}",
+    joinColumns = @JoinColumn(name = "{join_table.join_column}"),
+    inverseJoinColumns = @JoinColumn(name = "{join_table.inverse_join_column}")
+)
+private Set<{target}> {name} = new HashSet<>();
+{% else %}
+
+@JsonIgnore
+@ManyToMany(mappedBy = "{mapped_by}")
+private Set<{target}> {name} = new HashSet<>();
+{% endif %}
+{% endif %}''',
+}
+
+# ------------------ Model ------------------
+
+ONE_TO_MANY = 'OneToMany'
+ONE_TO_ONE = 'OneToOne'
+MANY_TO_MANY = 'ManyToMany'
+
+intern = sys.intern
+
+
+@dataclass(frozen=True, slots=True)
+class Attribute:
+    name: str
+    type: str
+
+
+@dataclass(frozen=True, slots=True)
+class Entity:
+    name: str
+    attrs: Tuple[Attribute, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class RawRelation:
+    left: str
+    left_token: str
+    right: str
+    right_token: str
+    label: str = ''
+
+
+@dataclass(frozen=True, slots=True)
+class ResolvedRelation:
+    """
+    OneToMany: a is the 'one' side, b the 'many' side.
+    OneToOne / ManyToMany: a is the owning side, b the inverse side.
+    """
+    type: str
+    a: str
+    b: str
+
+    @property
+    def one(self) -> str:
+        return self.a
+
+    @property
+    def many(self) -> str:
+        return self.b
 
-ENTITY_RE = re.compile(r"(?:entity|class)\s+(\w+)\s*\{([^}]*)\}", re.IGNORECASE | re.DOTALL)
+
+# ------------------ Lexer (single pass) ------------------
+
+TOK_START = 'START'
+TOK_END = 'END'
+TOK_COMMENT = 'COMMENT'
+TOK_ENTITY = 'ENTITY'
+TOK_ATTR = 'ATTR'
+TOK_ENTITY_END = 'ENTITY_END'
+TOK_RELATION = 'RELATION'
+
+ENTITY_OPEN_RE = re.compile(r"(?:entity|class)\s+(\w+)\s*(\{)?", re.IGNORECASE)
 RELATION_RE = re.compile(r"^\s*(\w+)\s*([<>\|o{}]+-{2,}>|-{2,}[<>\|o{}]+)\s*(\w+)(?:\s*:\s*(.*))?$")
+RELATION_LEFT_RE = re.compile(r'^(\w+)\s*([\|\{\}o<>]*)$')
+RELATION_RIGHT_RE = re.compile(r'^([\|\{\}o<>]*)\s*(\w+)(?:\s*:\s*(.*))?$')
+ATTR_PREFIX_RE = re.compile(r'^[+\-#*]+')
+WORD_RE = re.compile(r"(\w+)")
 
 
-def parse_entities(text: str) -> Dict[str, Dict]:
-    entities = {}
-    for m in ENTITY_RE.finditer(text):
-        name = m.group(1).strip()
-        body = m.group(2).strip()
-        attrs = []
-        for line in body.splitlines():
-            line = line.strip()
-            if not line or line.startswith('//'):
-                continue
-            parts = [p.strip() for p in line.split(':', 1)]
-            if len(parts) == 2:
-                aname, atype = parts
+class Token(NamedTuple):
+    kind: str
+    line: int
+    value: object
+
+
+def _lex_attr(line: str) -> Optional[Attribute]:
+    parts = [p.strip() for p in line.split(':', 1)]
+    if len(parts) == 2:
+        aname, atype = parts
+    else:
+        aname = parts[0]
+        atype = 'String'
+    aname = ATTR_PREFIX_RE.sub('', aname).strip()
+    if not aname:
+        return None
+    return Attribute(intern(aname), intern(atype))
+
+
+def _lex_relation(line: str) -> Optional[RawRelation]:
+    m = RELATION_RE.match(line)
+    if m:
+        left, token, right, label = m.group(1), m.group(2), m.group(3), m.group(4)
+    else:
+        parts = line.split('--')
+        if len(parts) < 2:
+            return None
+        left_part = parts[0].strip()
+        right_part = '--'.join(parts[1:]).strip()
+        lm = RELATION_LEFT_RE.match(left_part)
+        rm = RELATION_RIGHT_RE.match(right_part)
+        if lm and rm:
+            left = lm.group(1)
+            token = (lm.group(2) or '') + '--' + (rm.group(1) or '')
+            right = rm.group(2)
+            label = None
+        else:
+            sp = WORD_RE.findall(line)
+            if len(sp) >= 2:
+                left, right = sp[0], sp[1]
+                token = '--'
+                label = None
             else:
-                aname = parts[0]
-                atype = 'String'
-            aname = re.sub(r'^[+\-#*]+', '', aname).strip()
-            if not aname:
-                continue
-            attrs.append((aname, atype))
-        entities[name] = {'name': name, 'attrs': attrs}
-    return entities
+                return None
+    left_token = token.split('--')[0]
+    right_token = token.split('--')[-1]
+    return RawRelation(intern(left), left_token, intern(right), right_token, (label or '').strip())
 
 
-def parse_relations(text: str) -> List[Dict]:
-    relations = []
-    for raw in text.splitlines():
+def tokenize(lines: Iterable[str]) -> Iterator[Token]:
+    """
+    Walks the PUML source exactly once and yields tokens for @startuml/@enduml
+    markers, comments, entity blocks, their attributes and relations.
+    """
+    body_of = None          # entity whose {...} body is currently open
+    header_of = None        # entity header seen, waiting for '{' on the next line
+    in_block_comment = False
+
+    for lineno, raw in enumerate(lines, 1):
         line = raw.strip()
-        if not line or line.startswith('//'):
+
+        if in_block_comment:
+            yield Token(TOK_COMMENT, lineno, line)
+            if line.endswith("'/"):
+                in_block_comment = False
             continue
-        if '--' in line:
-            m = RELATION_RE.match(line)
-            if m:
-                left, token, right, label = m.group(1), m.group(2), m.group(3), m.group(4)
-            else:
-                parts = line.split('--')
-                if len(parts) < 2:
-                    continue
-                left_part = parts[0].strip()
-                right_part = '--'.join(parts[1:]).strip()
-                lm = re.match(r'^(\w+)\s*([\|\{\}o<>]*)$', left_part)
-                rm = re.match(r'^([\|\{\}o<>]*)\s*(\w+)(?:\s*:\s*(.*))?$', right_part)
-                if lm and rm:
-                    left = lm.group(1)
-                    token = (lm.group(2) or '') + '--' + (rm.group(1) or '')
-                    right = rm.group(2)
-                    label = None
-                else:
-                    sp = re.findall(r"(\w+)", line)
-                    if len(sp) >= 2:
-                        left, right = sp[0], sp[1]
-                        token = '--'
-                        label = None
-                    else:
+
+        # text after a body closed on this line is lexed again, so that
+        # `class A { a: int } class B { b: int }` yields both entities
+        rest = line
+        while rest:
+            line, rest = rest, ''
+
+            if header_of is not None:
+                name, header_of = header_of, None
+                if line.startswith('{'):
+                    yield Token(TOK_ENTITY, lineno, intern(name))
+                    body_of = name
+                    line = line[1:].strip()
+                    if not line:
                         continue
-            left_token = token.split('--')[0]
-            right_token = token.split('--')[-1]
-            relations.append({'left': left, 'left_token': left_token, 'right': right, 'right_token': right_token, 'label': (label or '').strip()})
-    return relations
+
+            if body_of is not None:
+                body, closed, after = line.partition('}')
+                body = body.strip()
+                if body.startswith('//'):
+                    yield Token(TOK_COMMENT, lineno, body)
+                elif body:
+                    attr = _lex_attr(body)
+                    if attr:
+                        yield Token(TOK_ATTR, lineno, attr)
+                if closed:
+                    yield Token(TOK_ENTITY_END, lineno, body_of)
+                    body_of = None
+                    rest = after.strip()
+                continue
+
+            lower = line.lower()
+            if lower.startswith('@startuml'):
+                yield Token(TOK_START, lineno, line)
+                continue
+            if lower.startswith('@enduml'):
+                yield Token(TOK_END, lineno, line)
+                continue
+            if line.startswith("/'"):
+                yield Token(TOK_COMMENT, lineno, line)
+                in_block_comment = not (len(line) >= 4 and line.endswith("'/"))
+                continue
+            if line.startswith("'") or line.startswith('//'):
+                yield Token(TOK_COMMENT, lineno, line)
+                continue
+
+            m = ENTITY_OPEN_RE.search(line)
+            if m and not m.group(2) and m.start() == 0 and m.end() == len(line):
+                header_of = m.group(1)
+                continue
+            if m and m.group(2):
+                yield Token(TOK_ENTITY, lineno, intern(m.group(1)))
+                body_of = m.group(1)
+                # the body (and whatever follows it) goes through the branch above
+                rest = line[m.end():].strip()
+                continue
+
+            if '--' in line:
+                rel = _lex_relation(line)
+                if rel:
+                    yield Token(TOK_RELATION, lineno, rel)
+
+
+# ------------------ Parser (simple, robust) ------------------
+
+READ_CHUNK_SIZE = 1 << 16
+
+
+def iter_model(lines: Iterable[str]) -> Iterator[Tuple[str, object]]:
+    """
+    Yields (TOK_ENTITY, entity) as soon as an entity block is closed and
+    (TOK_RELATION, relation) for every relation line.
+    """
+    name = None
+    attrs = None
+    for tok in tokenize(lines):
+        kind = tok.kind
+        if kind == TOK_ATTR:
+            if attrs is not None:
+                attrs.append(tok.value)
+        elif kind == TOK_RELATION:
+            yield TOK_RELATION, tok.value
+        elif kind == TOK_ENTITY:
+            name = tok.value
+            attrs = []
+        elif kind == TOK_ENTITY_END:
+            if attrs is not None:
+                yield TOK_ENTITY, Entity(name, tuple(attrs))
+            name = attrs = None
+
+
+def read_lines(fileobj, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Reads a text or binary file object (or an mmap) in fixed size chunks
+    and yields its lines. Only one chunk plus the current line is held.
+    """
+    decoder = None
+    pending = ''
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        if isinstance(chunk, bytes):
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder('utf-8')()
+            chunk = decoder.decode(chunk)
+        lines = (pending + chunk).split('\n')
+        pending = lines.pop()
+        yield from lines
+    if decoder is not None:
+        pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending
+
+
+def parse_stream(fileobj, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Tuple[str, object]]:
+    return iter_model(read_lines(fileobj, chunk_size))
+
+
+def parse_path(path: Path, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Tuple[str, object]]:
+    """
+    Streams a PUML file through mmap, falling back to buffered reads for
+    empty files or file systems that cannot be mapped.
+    """
+    with open(path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            yield from parse_stream(f, chunk_size)
+            return
+        with mm:
+            yield from parse_stream(mm, chunk_size)
+
+
+def collect_model(items: Iterable[Tuple[str, object]]) -> Tuple[Dict[str, Entity], List[RawRelation]]:
+    entities = {}
+    relations = []
+    for kind, item in items:
+        if kind == TOK_ENTITY:
+            entities[item.name] = item
+        else:
+            relations.append(item)
+    return entities, relations
+
+
+def parse(text: str) -> Tuple[Dict[str, Entity], List[RawRelation]]:
+    """
+    Parses entities and relations from one pass over the token stream.
+    """
+    return collect_model(iter_model(text.splitlines()))
+
+
+def parse_entities(text: str) -> Dict[str, Entity]:
+    return parse(text)[0]
+
+
+def parse_relations(text: str) -> List[RawRelation]:
+    return parse(text)[1]
 
 
 def detect_mult(token: str) -> str:
@@ -365,336 +670,3121 @@ def detect_mult(token: str) -> str:
     return 'UNKNOWN'
 
 
-def decide_relation(rel: Dict) -> Dict:
-    lt = detect_mult(rel['left_token'])
-    rt = detect_mult(rel['right_token'])
-    left = rel['left']
-    right = rel['right']
+def decide_relation(rel: RawRelation) -> ResolvedRelation:
+    lt = detect_mult(rel.left_token)
+    rt = detect_mult(rel.right_token)
+    left = rel.left
+    right = rel.right
     if lt == 'ONE' and rt == 'MANY':
-        return {'type': 'OneToMany', 'one': left, 'many': right}
+        return ResolvedRelation(ONE_TO_MANY, left, right)
     if lt == 'MANY' and rt == 'ONE':
-        return {'type': 'OneToMany', 'one': right, 'many': left}
+        return ResolvedRelation(ONE_TO_MANY, right, left)
     if lt == 'ONE' and rt == 'ONE':
-        return {'type': 'OneToOne', 'a': left, 'b': right}
+        return ResolvedRelation(ONE_TO_ONE, left, right)
     if lt == 'MANY' and rt == 'MANY':
-        return {'type': 'ManyToMany', 'a': left, 'b': right}
-    return {'type': 'OneToMany', 'one': left, 'many': right}
+        return ResolvedRelation(MANY_TO_MANY, left, right)
+    return ResolvedRelation(ONE_TO_MANY, left, right)
+
+# ------------------ Resolver ------------------
+
+MANY_TO_ONE = 'ManyToOne'
+
+
+@dataclass(frozen=True, slots=True)
+class JoinTable:
+    name: str
+    join_column: str
+    inverse_join_column: str
+    owner: str
+    inverse: str
+
+
+@dataclass(frozen=True, slots=True)
+class RelationField:
+    """
+    A relation field as it appears on one entity. `mapped_by` is set on the
+    inverse side, `join_column` / `join_table` on the owning side.
+    """
+    type: str
+    target: str
+    name: str
+    mapped_by: str = ''
+    join_column: str = ''
+    join_table: Optional[JoinTable] = None
+
+
+@dataclass(frozen=True, slots=True)
+class ResolvedEntity:
+    entity: Entity
+    name: str
+    table: str
+    var: str
+    collection: str
+    foreign_key: Optional[str]
+    fields: Tuple[RelationField, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class ResolvedModel:
+    entities: Dict[str, ResolvedEntity]
+    relations: Tuple[ResolvedRelation, ...]
+    join_tables: Tuple[JoinTable, ...]
+
+
+def resolve(entities: Dict[str, Entity], relations_raw: Iterable[RawRelation]) -> ResolvedModel:
+    """
+    Decides every relation once and derives everything the generators need
+    from it: relation fields per entity (in source order), foreign keys,
+    join tables and the entity's variable / collection / table names.
+    """
+    relations = tuple(decide_relation(r) for r in relations_raw)
+    fields: Dict[str, List[RelationField]] = {}
+    foreign_keys: Dict[str, str] = {}
+    join_tables = []
+
+    for r in relations:
+        if r.type == ONE_TO_MANY:
+            one, many = r.one, r.many
+            fields.setdefault(one, []).append(
+                RelationField(ONE_TO_MANY, many, to_camel(many) + "s", mapped_by=to_camel(one)))
+            fields.setdefault(many, []).append(
+                RelationField(MANY_TO_ONE, one, to_camel(one), join_column=f"{one.lower()}_id"))
+            foreign_keys[many] = one
+        elif r.type == MANY_TO_MANY:
+            a, b = r.a, r.b
+            jt = JoinTable(f"{a.lower()}_{b.lower()}", f"{a.lower()}_id", f"{b.lower()}_id", a, b)
+            join_tables.append(jt)
+            fields.setdefault(a, []).append(
+                RelationField(MANY_TO_MANY, b, to_camel(b) + "s", join_table=jt))
+            if b != a:
+                fields.setdefault(b, []).append(
+                    RelationField(MANY_TO_MANY, a, to_camel(a) + "s", mapped_by=to_camel(b) + "s"))
+
+    resolved = {}
+    for name, entity in entities.items():
+        var = to_camel(name)
+        resolved[name] = ResolvedEntity(
+            entity=entity,
+            name=name,
+            table=name.lower(),
+            var=var,
+            collection=var + "s",
+            foreign_key=foreign_keys.get(name),
+            fields=tuple(fields.get(name, ())),
+        )
+    return ResolvedModel(resolved, relations, tuple(join_tables))
 
 # ------------------ Renderer ------------------
 
-def render_entity(base_pkg: str, name: str, meta: Dict, relations: List[Dict], tpl: str, use_lombok: bool = False) -> str:
-    attrs = meta["attrs"]
-    
+# PUML attribute type (lower case) -> Java type; types not listed are used
+# as written. Extend it here, or per run with generate_project(type_map=...).
+JAVA_TYPES = {
+    "string": "String",
+    "int": "Integer",
+    "integer": "Integer",
+    "long": "Long",
+    "double": "Double",
+    "float": "Float",
+    "boolean": "Boolean",
+}
+
+LOMBOK_IMPORTS = "\n".join([
+    "import lombok.Getter;",
+    "import lombok.Setter;",
+    "import lombok.Builder;",
+    "import lombok.NoArgsConstructor;",
+    "import lombok.AllArgsConstructor;",
+])
+LOMBOK_ANNOTATIONS = "@Getter\n@Setter\n@Builder\n@NoArgsConstructor\n@AllArgsConstructor"
+
+
+def java_types(type_map: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    if not type_map:
+        return JAVA_TYPES
+    return {**JAVA_TYPES, **{k.lower(): v for k, v in type_map.items()}}
+
+
+def render_entity(base_pkg: str, entity: ResolvedEntity, tpl, use_lombok: bool = False, partials: Optional[Dict[str, 'CompiledTemplate']] = None, type_map: Optional[Dict[str, str]] = None) -> str:
+    """
+    `partials` are the compiled field / accessor / relation snippets (the
+    built-in ones by default), `type_map` extends JAVA_TYPES.
+    """
+    name = entity.name
+    partials = partials or default_partials()
+    id_field = partials['id_field'].render
+    field_ = partials['field'].render
+    id_accessors = partials['id_accessors'].render
+    accessors = partials['accessors'].render
+    relation = partials['relation'].render
+    jmap = java_types(type_map)
+
     fields = []
     getters_setters = []
     relation_fields = []
 
-    extra_imports = []
-
-    # Lombok
-    lombok_annotations = ""
-    if use_lombok:
-        extra_imports.append("import lombok.Getter;")
-        extra_imports.append("import lombok.Setter;")
-        extra_imports.append("import lombok.Builder;")
-        extra_imports.append("import lombok.NoArgsConstructor;")
-        extra_imports.append("import lombok.AllArgsConstructor;")
-        lombok_annotations = "@Getter\n@Setter\n@Builder\n@NoArgsConstructor\n@AllArgsConstructor"
-
     # ------------------ normal fields ------------------
-    for aname, atype in attrs:
+    for attr in entity.entity.attrs:
+        aname, atype = attr.name, attr.type
         if aname.lower() == "id":
-            fields.append("    @Id\n    @GeneratedValue\n    private Long id;")
+            fields.append(id_field())
             if not use_lombok:
-                getters_setters.append(textwrap.dedent("""
-                    public Long getId() { return id; }
-                    public void setId(Long id) { this.id = id; }
-                """))
+                getters_setters.append(id_accessors())
             continue
 
-        jmap = {
-            "string": "String",
-            "int": "Integer",
-            "integer": "Integer",
-            "long": "Long",
-            "double": "Double",
-            "float": "Float",
-            "boolean": "Boolean",
-        }
         jtype = jmap.get(atype.lower(), atype)
-
-        fields.append(f"    private {jtype} {aname};")
+        fields.append(field_(type=jtype, name=aname))
 
         if not use_lombok:
             cap = aname[0].upper() + aname[1:]
-            getters_setters.append(textwrap.dedent(f"""
-                public {jtype} get{cap}() {{ return {aname}; }}
-                public void set{cap}({jtype} {aname}) {{ this.{aname} = {aname}; }}
-            """))
+            getters_setters.append(accessors(type=jtype, name=aname, cap=cap))
 
     # ------------------ relations ------------------
-    for r in relations:
-        if r["type"] == "OneToMany" and r["one"] == name:
-            many = r["many"]
-            field = to_camel(many) + "s"
-            mapped_by = to_camel(name)
-            relation_fields.append(textwrap.dedent(f"""
-                @JsonIgnore
-                @OneToMany(mappedBy = "{mapped_by}")
-                private Set<{many}> {field} = new HashSet<>();
-            """))
-
-        if r["type"] == "OneToMany" and r["many"] == name:
-            one = r["one"]
-            camel = to_camel(one)
-            relation_fields.append(textwrap.dedent(f"""
-                @JsonIgnore
-                @ManyToOne
-                @JoinColumn(name = "{one.lower()}_id")
-                private {one} {camel};
-            """))
-
-        if r["type"] == "ManyToMany":
-            a, b = r["a"], r["b"]
-            if a == name:
-                other = b
-                field = to_camel(other) + "s"
-                relation_fields.append(textwrap.dedent(f"""
-                    @JsonIgnore
-                    @ManyToMany
-                    @JoinTable(
-                        name = "{name.lower()}_{other.lower()}",
-                        joinColumns = @JoinColumn(name = "{name.lower()}_id"),
-                        inverseJoinColumns = @JoinColumn(name = "{other.lower()}_id")
-                    )
-                    private Set<{other}> {field} = new HashSet<>();
-                """))
-            elif b == name:
-                other = a
-                field = to_camel(other) + "s"
-                mapped_by = to_camel(name) + "s"
-                relation_fields.append(textwrap.dedent(f"""
-                    @JsonIgnore
-                    @ManyToMany(mappedBy = "{mapped_by}")
-                    private Set<{other}> {field} = new HashSet<>();
-                """))
-
-    final = tpl.format(
+    for f in entity.fields:
+        text = relation(type=f.type, target=f.target, name=f.name, mapped_by=f.mapped_by,
+                        join_column=f.join_column, join_table=f.join_table)
+        if text:
+            relation_fields.append(text)
+
+    final = as_template(tpl).render(
         package=base_pkg,
         ClassName=name,
         fields="\n".join(fields + relation_fields),
         getters_setters="\n".join(getters_setters),
-        extra_imports="\n".join(extra_imports),
-        lombok_annotations=lombok_annotations,
-        class_name_lower=name.lower()
+        extra_imports=LOMBOK_IMPORTS if use_lombok else "",
+        lombok_annotations=LOMBOK_ANNOTATIONS if use_lombok else "",
+        class_name_lower=entity.table,
+        use_lombok=use_lombok,
+        entity=entity,
+        attributes=entity.entity.attrs,
+        relations=entity.fields,
     )
 
     return final
 
 
-# ------------------ Main generator ------------------
+def render_repository(base_pkg: str, entity: ResolvedEntity, tpl: str) -> str:
+    return as_template(tpl).render(pkg=base_pkg, entity=entity.name)
+
+
+def render_resource(base_pkg: str, entity: ResolvedEntity, tpl: str) -> str:
+    return as_template(tpl).render(
+        package=base_pkg,
+        Entity=entity.name,
+        entity=entity.var,
+        entities=entity.collection
+    )
+
+
+# ------------------ Writer ------------------
+
+HASH_CHUNK_SIZE = 1 << 16
+STREAM_CHUNK_SIZE = 1 << 16
+SPOOL_MAX_SIZE = 8 << 20        # streamed content beyond this goes to a temporary file
+
+ARTIFACT_WRITTEN = 'written'
+ARTIFACT_SKIPPED = 'skipped'
+ARTIFACT_KEPT = 'kept'          # edited by hand since the last run, left alone
+ARTIFACT_DELETED = 'deleted'
+ARTIFACT_PENDING = 'pending'    # handed to a ConcurrentWriter, the status comes from drain()
+
+
+@dataclass(slots=True)
+class WriteStats:
+    written: int = 0
+    skipped: int = 0
+    deleted: int = 0
+    kept: List[str] = field(default_factory=list)
+    diff: Optional['ModelDiff'] = None
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+    def count(self, rel: str, status: str):
+        if status == ARTIFACT_WRITTEN:
+            self.written += 1
+        elif status == ARTIFACT_SKIPPED:
+            self.skipped += 1
+        elif status == ARTIFACT_DELETED:
+            self.deleted += 1
+        else:
+            self.kept.append(rel)
 
-def generate_import_sql(entities, relations):
+
+def _file_digest(path) -> bytes:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            h.update(chunk)
+    return h.digest()
+
+
+def write_if_changed(path, content) -> bool:
     """
-    Generiert INSERT Statements für alle Entities mit festen IDs (1,2,3...),
-    inkl. Foreign Keys und ManyToMany Tabellen.
+    Writes `content` (str or bytes) unless the file already holds exactly
+    these bytes (size first, then hash), so unchanged files keep their mtime.
+    Returns True if the file was written.
     """
-    sql_lines = []
-    id_counters = {ename: 1 for ename in entities}
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    try:
+        if os.stat(path).st_size == len(data) and _file_digest(path) == hashlib.sha256(data).digest():
+            return False
+    except FileNotFoundError:
+        pass
+    publish_file(path, data)
+    return True
 
-    fk_map = {}
-    for r in relations:
-        if r['type'] == 'OneToMany':
-            fk_map[r['many']] = r['one']
-
-    for ename, meta in entities.items():
-        for i in range(1, 2):
-            columns = []
-            values = []
-
-            for attr, typ in meta["attrs"]:
-                if attr.lower() == "id":
-                    columns.append("id")
-                    values.append(str(id_counters[ename]))
-                    continue
 
-                if ename in fk_map and attr.lower() == f"{fk_map[ename].lower()}_id":
-                    columns.append(attr)
-                    values.append("1")
-                    continue
+def _open_temp(path) -> Tuple[str, io.BufferedWriter]:
+    tmp = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    # os.open instead of mkstemp: the file gets the usual umask permissions
+    return tmp, open(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666), 'wb')
 
-                columns.append(attr)
-                if typ.lower() in ["string", "varchar", "text"]:
-                    values.append(f"'{ename}_{i}'")
-                elif typ.lower() in ["int", "integer"]:
-                    values.append(str(random.randint(1, 100)))
-                elif typ.lower() in ["double", "float"]:
-                    values.append(str(round(random.uniform(1.0, 100.0), 2)))
-                else:
-                    values.append("NULL")
 
-            sql_lines.append(f"INSERT INTO {ename.lower()} ({', '.join(columns)}) VALUES ({', '.join(values)});")
-            id_counters[ename] += 1
+def _discard_temp(tmp: str):
+    try:
+        os.unlink(tmp)
+    except FileNotFoundError:
+        pass
 
-    for r in relations:
-        if r['type'] == 'ManyToMany':
-            a, b = r['a'].lower(), r['b'].lower()
-            join_table = f"{a}_{b}"
-            sql_lines.append(f"INSERT INTO {join_table} ({a}_id, {b}_id) VALUES (1, 1);")
 
-    return "\n".join(sql_lines)
+def publish_file(path, data: bytes):
+    """
+    Writes `data` to a temporary file next to `path` and renames it into
+    place, so a crash or a concurrent reader never sees a half-written file.
+    """
+    tmp, f = _open_temp(path)
+    try:
+        with f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        _discard_temp(tmp)
+        raise
 
-def generate_pom_xml(project_root: Path, base_pkg: str, artifact: str, tpl: str, use_lombok: bool):
 
-    lombok_dep = ""
-    lombok_ap = ""
+def stream_if_changed(path, chunks: Iterable[bytes]) -> bool:
+    """
+    write_if_changed() for content produced piece by piece: the chunks go
+    straight to a temporary file, which replaces `path` unless that already
+    holds the same bytes. Returns True if the file was written.
+    """
+    tmp, f = _open_temp(path)
+    try:
+        h = hashlib.sha256()
+        with f:
+            for chunk in chunks:
+                f.write(chunk)
+                h.update(chunk)
+            size = f.tell()
+        try:
+            same = os.stat(path).st_size == size and _file_digest(path) == h.digest()
+        except FileNotFoundError:
+            same = False
+        if same:
+            _discard_temp(tmp)
+            return False
+        os.replace(tmp, path)
+        return True
+    except BaseException:
+        _discard_temp(tmp)
+        raise
+
+
+def encode_lines(lines: Iterable[str], sep: str = '\n') -> Iterator[bytes]:
+    """
+    Same bytes as sep.join(lines).encode(), in chunks of about
+    STREAM_CHUNK_SIZE, so big outputs never sit in memory as a whole.
+    """
+    buf: List[str] = []
+    size = 0
+    first = True
+    for line in lines:
+        if not first:
+            buf.append(sep)
+        first = False
+        buf.append(line)
+        size += len(line) + 1
+        if size >= STREAM_CHUNK_SIZE:
+            yield ''.join(buf).encode('utf-8')
+            buf = []
+            size = 0
+    yield ''.join(buf).encode('utf-8')
+
+
+def fsync_path(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+# ------------------ Output sinks ------------------
+
+class OutputSink:
+    """
+    Where generated files go. Paths are relative to the project root and
+    use '/'. Sinks that are `shared` are handed to worker processes, which
+    then write directly; for the others the workers only render. Sinks that
+    are `threadsafe` are written through a ConcurrentWriter.
+    """
+    shared = False
+    threadsafe = False
+    name = 'project'
 
-    if use_lombok:
-        lombok_dep = textwrap.dedent("""
-            <dependency>
-                <groupId>org.projectlombok</groupId>
-                <artifactId>lombok</artifactId>
-                <version>1.18.42</version>
-                <scope>provided</scope>
-            </dependency>
-        """).rstrip()
-
-        lombok_ap = textwrap.dedent("""
-            <annotationProcessorPaths>
-                <path>
-                    <groupId>org.projectlombok</groupId>
-                    <artifactId>lombok</artifactId>
-                    <version>1.18.42</version>
-                </path>
-            </annotationProcessorPaths>
-        """).rstrip()
-
-    pom = tpl.format(
-        group_id=base_pkg,
-        artifact_id=artifact,
-        version="1.0.0-SNAPSHOT",
-        lombok_dependency=lombok_dep,
-        lombok_processor=lombok_ap
-    )
+    def write(self, rel: str, data: bytes) -> bool:
+        """
+        Stores `data` under `rel`, returns False if it already held it.
+        """
+        raise NotImplementedError
 
-    (project_root / "pom.xml").write_text(pom)
-
-def load_template(tpl_dir: Path, name: str, default: str) -> str:
-    f = tpl_dir / name
-    if not f.exists():
-        f.write_text(default)
-    return f.read_text()
-
-
-def generate(project_root: Path, base_pkg: str, entities: Dict[str, Dict], relations_raw: List[Dict], tpl_dir: Path, use_lombok:bool):
-    # prepare tree
-    src_main = project_root / 'src' / 'main' / 'java'
-    pkg_path = src_main / Path(*base_pkg.split('.'))
-    entities_path = pkg_path / 'entities'
-    repos_path = pkg_path / 'repositories'
-    resources_path = pkg_path / 'resources'
-    (entities_path).mkdir(parents=True, exist_ok=True)
-    (repos_path).mkdir(parents=True, exist_ok=True)
-    (resources_path).mkdir(parents=True, exist_ok=True)
-    (project_root / 'src' / 'main' / 'resources').mkdir(parents=True, exist_ok=True)
-
-    # load templates
-    entity_tpl = load_template(tpl_dir, 'entity.tpl', DEFAULT_ENTITY_TPL)
-    repo_tpl = load_template(tpl_dir, 'repository.tpl', DEFAULT_REPO_TPL)
-    resource_tpl = load_template(tpl_dir, 'resource.tpl', DEFAULT_RESOURCE_TPL)
-    pom_tpl = load_template(tpl_dir, 'pom.tpl', DEFAULT_POM_TPL)
-    app_tpl = load_template(tpl_dir, 'application.properties.tpl', DEFAULT_APP_TPL)
-    readme_tpl = load_template(tpl_dir, 'readme.tpl', DEFAULT_README)
-
-    # decide relations
-    rel_objs = [decide_relation(r) for r in relations_raw]
-
-    # render entities
-    for ename, meta in entities.items():
-        code = render_entity(base_pkg, ename, meta, rel_objs, entity_tpl, use_lombok=use_lombok)
-        (entities_path / f"{ename}.java").write_text(code)
-
-    # repositories
-    for ename in entities:
-        r = repo_tpl.format(pkg=base_pkg, entity=ename)
-        (repos_path / f"{ename}Repository.java").write_text(r)
-
-    # resources
-    for ename in entities:
-        entity_lower = to_camel(ename)
-        entities_lower = entity_lower + "s"
-
-        res = resource_tpl.format(
-            package=base_pkg,
-            Entity=ename,
-            entity=entity_lower,
-            entities=entities_lower
-        )
+    def write_stream(self, rel: str, chunks: Iterable[bytes]) -> bool:
+        """
+        write() for content that is produced in chunks. Sinks that can
+        store it without joining the chunks first override this.
+        """
+        return self.write(rel, b''.join(chunks))
 
-        (resources_path / f"{ename}Resource.java").write_text(res)
+    def read(self, rel: str) -> Optional[bytes]:
+        return None
 
+    def iter_lines(self, rel: str) -> Iterator[str]:
+        data = self.read(rel)
+        if data is not None:
+            yield from data.decode('utf-8').splitlines(keepends=True)
 
-    rel_objs = [decide_relation(r) for r in relations_raw]
+    def stat(self, rel: str) -> Optional[Tuple[int, int]]:
+        """
+        (size, mtime_ns) of a stored file, None if there is none.
+        """
+        return None
 
-    # pom + app + readme
-    group = base_pkg
-    artifact = project_root.name
-    
-    generate_pom_xml(
-        project_root=project_root,
-        base_pkg=group,
-        artifact=artifact,
-        tpl=pom_tpl,
-        use_lombok=use_lombok
-    )
+    def digest(self, rel: str) -> bytes:
+        return hashlib.sha256(self.read(rel) or b'').digest()
 
-    (project_root / 'src' / 'main' / 'resources' / 'application.properties').write_text(app_tpl)
-    (project_root / 'src' / 'main' / 'resources' / 'import.sql').write_text(generate_import_sql(entities=entities, relations=rel_objs))
-    (project_root / 'README.md').write_text(readme_tpl)
+    def delete(self, rel: str):
+        pass
 
-    print(f"Project generated at: {project_root}")
+    def makedirs(self, dirs: Iterable[str]):
+        """
+        Creates the given directories up front, before any file is written.
+        """
 
-# ------------------ CLI ------------------
+    def sync(self, rels: Iterable[str]):
+        """
+        Makes the given files durable (fsync), if the sink can.
+        """
 
-def main():
-    # Expected:
-    # python puml_to_quarkus_generator.py input.puml output_dir base.package [--lombok]
+    def close(self):
+        pass
 
-    if len(sys.argv) < 4 or len(sys.argv) > 5:
-        print('Usage: python puml_to_quarkus_generator.py input.puml output_dir base.package [--lombok]')
-        sys.exit(1)
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class DirectorySink(OutputSink):
+    """
+    Writes into a directory. Files are published atomically (temp file +
+    rename); parent directories are created by makedirs() or on first use.
+    """
+    shared = True
+    threadsafe = True
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.name = self.root.name
+
+    def __str__(self):
+        return str(self.root)
+
+    def _path(self, rel: str) -> str:
+        return os.path.join(self.root, rel)
+
+    def write(self, rel: str, data: bytes) -> bool:
+        path = self._path(rel)
+        try:
+            return write_if_changed(path, data)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            return write_if_changed(path, data)
+
+    def write_stream(self, rel: str, chunks: Iterable[bytes]) -> bool:
+        path = self._path(rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return stream_if_changed(path, chunks)
+
+    def read(self, rel: str) -> Optional[bytes]:
+        try:
+            with open(self._path(rel), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def iter_lines(self, rel: str) -> Iterator[str]:
+        try:
+            with open(self._path(rel), encoding='utf-8') as f:
+                yield from f
+        except FileNotFoundError:
+            pass
+
+    def stat(self, rel: str) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self._path(rel))
+        except FileNotFoundError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def digest(self, rel: str) -> bytes:
+        return _file_digest(self._path(rel))
+
+    def delete(self, rel: str):
+        os.unlink(self._path(rel))
+
+    def makedirs(self, dirs: Iterable[str]):
+        for d in sorted(set(dirs)):
+            os.makedirs(self._path(d), exist_ok=True)
+
+    def sync(self, rels: Iterable[str], threads: int = 0):
+        """
+        One group fsync: all files first (in parallel, each is a round trip
+        on a network mount), then each of their directories once, so the
+        renames are durable as well.
+        """
+        paths = [self._path(rel) for rel in rels]
+        with ThreadPoolExecutor(max_workers=threads or WRITE_THREADS) as pool:
+            list(pool.map(fsync_path, paths))
+        if os.name == 'posix':
+            # directories cannot be opened for fsync on Windows
+            for d in sorted({os.path.dirname(p) for p in paths}):
+                fsync_path(d)
+
+
+class MemorySink(OutputSink):
+    """
+    Keeps the generated project in `files` ({relative path: bytes}), e.g.
+    for previews. Reusing the same sink makes the next run incremental.
+    """
+
+    def __init__(self, name: str = 'project'):
+        self.name = name
+        self.files: Dict[str, bytes] = {}
+        self._mtimes: Dict[str, int] = {}
+        self._clock = 0
+
+    def write(self, rel: str, data: bytes) -> bool:
+        if self.files.get(rel) == data:
+            return False
+        self._clock += 1
+        self.files[rel] = data
+        self._mtimes[rel] = self._clock
+        return True
+
+    def read(self, rel: str) -> Optional[bytes]:
+        return self.files.get(rel)
+
+    def stat(self, rel: str) -> Optional[Tuple[int, int]]:
+        data = self.files.get(rel)
+        if data is None:
+            return None
+        return len(data), self._mtimes[rel]
+
+    def delete(self, rel: str):
+        del self.files[rel]
+        del self._mtimes[rel]
+
+
+ARCHIVE_FORMATS = {'.zip': 'zip', '.tar.gz': 'w:gz', '.tgz': 'w:gz', '.tar': 'w'}
 
-    puml = Path(sys.argv[1])
-    out = Path(sys.argv[2])
-    base_pkg = sys.argv[3]
 
-    use_lombok = False
-    if len(sys.argv) == 5:
-        if sys.argv[4] == "--lombok":
-            use_lombok = True
+def archive_format(path: Path) -> Optional[str]:
+    name = path.name.lower()
+    for suffix, fmt in ARCHIVE_FORMATS.items():
+        if name.endswith(suffix):
+            return fmt
+    return None
+
+
+class ArchiveSink(OutputSink):
+    """
+    Streams each file into a .zip / .tar.gz / .tar as soon as it is
+    rendered, under a `name/` top-level folder. Nothing else is written to
+    disk and only one file is held in memory at a time. Write-only, so
+    every run is a full one and the manifest is left out.
+    """
+
+    def __init__(self, path, name: Optional[str] = None):
+        self.path = Path(path)
+        fmt = archive_format(self.path)
+        if fmt is None:
+            raise ValueError(f"unsupported archive type: {self.path.name} (use {', '.join(ARCHIVE_FORMATS)})")
+        self.name = name or self.path.name.split('.', 1)[0]
+        if fmt == 'zip':
+            self._zip = zipfile.ZipFile(self.path, 'w', zipfile.ZIP_DEFLATED)
+            self._tar = None
         else:
-            print("Error: Unknown option:", sys.argv[4])
-            print('Usage: python puml_to_quarkus_generator.py input.puml output_dir base.package [--lombok]')
-            sys.exit(1)
+            self._zip = None
+            self._tar = tarfile.open(self.path, fmt)
+
+    def __str__(self):
+        return str(self.path)
+
+    def write(self, rel: str, data: bytes) -> bool:
+        if rel.split('/', 1)[0] == MANIFEST_DIR:
+            return False
+        arcname = f"{self.name}/{rel}"
+        if self._zip is not None:
+            self._zip.writestr(arcname, data)
+        else:
+            info = tarfile.TarInfo(arcname)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            info.mode = 0o644
+            self._tar.addfile(info, io.BytesIO(data))
+        return True
+
+    def write_stream(self, rel: str, chunks: Iterable[bytes]) -> bool:
+        if rel.split('/', 1)[0] == MANIFEST_DIR:
+            return False
+        arcname = f"{self.name}/{rel}"
+        if self._zip is not None:
+            with self._zip.open(arcname, 'w', force_zip64=True) as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            return True
+        # a tar header needs the size up front, so big files are spooled to disk
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as f:
+            for chunk in chunks:
+                f.write(chunk)
+            info = tarfile.TarInfo(arcname)
+            info.size = f.tell()
+            info.mtime = int(time.time())
+            info.mode = 0o644
+            f.seek(0)
+            self._tar.addfile(info, f)
+        return True
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+        if self._tar is not None:
+            self._tar.close()
+
+    def __exit__(self, exc_type, *exc):
+        self.close()
+        if exc_type is not None:
+            # no half written archives
+            self.path.unlink(missing_ok=True)
+
+
+def as_sink(target) -> OutputSink:
+    """
+    Accepts an OutputSink or a directory path.
+    """
+    return target if isinstance(target, OutputSink) else DirectorySink(target)
 
-    if not puml.exists():
-        print('Input PUML not found:', puml)
-        sys.exit(1)
+# ------------------ Concurrent writer ------------------
 
-    tpl_dir = ensure_templates_dir(Path(__file__).parent)
+WRITE_THREADS = 8
 
-    text = puml.read_text(encoding='utf-8')
-    entities = parse_entities(text)
-    relations_raw = parse_relations(text)
 
-    generate(out, base_pkg, entities, relations_raw, tpl_dir, use_lombok=use_lombok)
+class ConcurrentWriter:
+    """
+    Writes the artifacts of a `threadsafe` sink through a bounded thread
+    pool, so the latency of many small writes (network mounts) overlaps
+    with rendering and with each other. At most `threads * 4` rendered
+    files wait in memory.
+    """
 
-    if use_lombok:
-        print("Project generated with Lombok support")
-    else:
-        print("Project generated without Lombok (classic getters/setters)")
+    def __init__(self, sink: OutputSink, threads: int = WRITE_THREADS):
+        self.sink = sink
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='writer')
+        self._slots = threading.BoundedSemaphore(threads * 4)
+        self._futures = []
+
+    def submit(self, rel: str, data: bytes, entry: Dict):
+        """
+        Writes `data` in the background; `size` and `mtime_ns` of the
+        manifest `entry` are filled in once the file is in place.
+        """
+        self._slots.acquire()
+        future = self._pool.submit(self._write, rel, data, entry)
+        future.add_done_callback(lambda _: self._slots.release())
+        self._futures.append(future)
+
+    def _write(self, rel: str, data: bytes, entry: Dict) -> Tuple[str, str, Dict]:
+        written = self.sink.write(rel, data)
+        entry['size'], entry['mtime_ns'] = self.sink.stat(rel) or (len(data), 0)
+        return rel, (ARTIFACT_WRITTEN if written else ARTIFACT_SKIPPED), entry
+
+    def drain(self) -> Iterator[Tuple[str, str, Dict]]:
+        """
+        Waits for everything submitted so far and yields (path, status,
+        entry); a failed write is raised here.
+        """
+        futures, self._futures = self._futures, []
+        for future in futures:
+            yield future.result()
+
+    def close(self):
+        self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# ------------------ Manifest ------------------
+
+MANIFEST_DIR = '.parser-toolbox'
+MANIFEST_FILE = 'manifest.json'
+MANIFEST_VERSION = 1
+
+
+def fragment_hash(*parts) -> str:
+    """
+    Hash of the model fragment / options an artifact is rendered from.
+    The model objects are frozen dataclasses, so their repr is stable.
+    """
+    return hashlib.sha256('\x00'.join(map(repr, parts)).encode('utf-8')).hexdigest()
 
 
-if __name__ == '__main__':
-    main()
+MANIFEST_PATH = f"{MANIFEST_DIR}/{MANIFEST_FILE}"
+
+
+# keys and types of one manifest file entry
+MANIFEST_ENTRY = {'content': str, 'template': str, 'fragment': str, 'size': int, 'mtime_ns': int}
+MANIFEST_MODEL_ENTITY = ('attrs', 'fields', 'sql')
+
+
+def _valid_manifest_entry(entry) -> bool:
+    return isinstance(entry, dict) and all(type(entry.get(key)) is kind for key, kind in MANIFEST_ENTRY.items())
+
+
+def _valid_model_snapshot(model) -> bool:
+    if not isinstance(model, dict) or not isinstance(model.get('options'), str) or not isinstance(model.get('seed', ''), str):
+        return False
+    entities = model.get('entities', {})
+    join_tables = model.get('join_tables', [])
+    return (isinstance(entities, dict)
+            and all(isinstance(e, dict) and all(isinstance(e.get(k), str) for k in MANIFEST_MODEL_ENTITY) for e in entities.values())
+            and isinstance(join_tables, list)
+            and all(isinstance(jt, list) and len(jt) == 2 and all(isinstance(x, str) for x in jt) for jt in join_tables))
+
+
+def load_manifest(sink: OutputSink) -> Dict:
+    """
+    Returns {'files': {path: entry}, 'model': snapshot or None}. The file
+    may have been edited or truncated: entries that are not well-formed are
+    dropped (their files are looked at as if new) and a malformed model
+    snapshot is ignored (nothing is diffed).
+    """
+    try:
+        data = json.loads(sink.read(MANIFEST_PATH) or b'{}')
+    except ValueError:
+        data = {}
+    if not isinstance(data, dict):
+        data = {}
+    if data.get('version') != MANIFEST_VERSION:
+        data = {}
+    files = data.get('files')
+    files = {rel: entry for rel, entry in files.items() if _valid_manifest_entry(entry)} if isinstance(files, dict) else {}
+    model = data.get('model')
+    return {'files': files, 'model': model if _valid_model_snapshot(model) else None}
+
+
+def save_manifest(sink: OutputSink, files: Dict[str, Dict], model: Optional[Dict] = None):
+    doc = {'version': MANIFEST_VERSION, 'files': files, 'model': model}
+    # compact separators keep json on its C encoder, which matters for big models
+    sink.write(MANIFEST_PATH, json.dumps(doc, sort_keys=True, separators=(',', ':')).encode('utf-8'))
+
+
+def _unchanged_since(sink: OutputSink, rel: str, st: Tuple[int, int], entry: Dict) -> bool:
+    if st == (entry['size'], entry['mtime_ns']):
+        return True
+    return sink.digest(rel).hex() == entry['content']
+
+
+def emit_artifact(sink: OutputSink, rel: str, prev: Optional[Dict], template_hash: str, fragment: str, render, force: bool = False, cache: Optional['RenderCache'] = None, writer: Optional[ConcurrentWriter] = None) -> Tuple[str, Dict]:
+    """
+    Renders and writes one artifact unless the manifest entry from the last
+    run shows the same template and model fragment. Files changed by hand
+    since then are reported as kept instead of being overwritten (unless
+    `force`). `render` may return str or bytes; with a `cache` it is only
+    called on a cache miss. Returns the status and the new manifest entry;
+    with a `writer` the write is only queued and the status is
+    ARTIFACT_PENDING until the writer drains. Without a cache `render` may
+    also return an iterator of bytes chunks, which is streamed to the sink.
+    """
+    st = sink.stat(rel)
+    if prev is not None and st is not None:
+        if not _unchanged_since(sink, rel, st, prev):
+            if not force:
+                return ARTIFACT_KEPT, prev
+        elif prev['template'] == template_hash and prev['fragment'] == fragment:
+            return ARTIFACT_SKIPPED, dict(prev, size=st[0], mtime_ns=st[1])
+
+    data = cache.get(template_hash, fragment, render) if cache is not None else render()
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    elif not isinstance(data, bytes):
+        return _emit_stream(sink, rel, template_hash, fragment, data)
+    entry = {
+        'content': hashlib.sha256(data).hexdigest(),
+        'template': template_hash,
+        'fragment': fragment,
+        'size': len(data),
+        'mtime_ns': 0,
+    }
+    if writer is not None:
+        writer.submit(rel, data, entry)
+        return ARTIFACT_PENDING, entry
+    written = sink.write(rel, data)
+    entry['size'], entry['mtime_ns'] = sink.stat(rel) or (len(data), 0)
+    return (ARTIFACT_WRITTEN if written else ARTIFACT_SKIPPED), entry
+
+
+def _emit_stream(sink: OutputSink, rel: str, template_hash: str, fragment: str, chunks: Iterable[bytes]) -> Tuple[str, Dict]:
+    h = hashlib.sha256()
+    total = 0
+
+    def hashed():
+        nonlocal total
+        for chunk in chunks:
+            h.update(chunk)
+            total += len(chunk)
+            yield chunk
+
+    written = sink.write_stream(rel, hashed())
+    size, mtime_ns = sink.stat(rel) or (total, 0)
+    entry = {
+        'content': h.hexdigest(),
+        'template': template_hash,
+        'fragment': fragment,
+        'size': size,
+        'mtime_ns': mtime_ns,
+    }
+    return (ARTIFACT_WRITTEN if written else ARTIFACT_SKIPPED), entry
+
+
+def remove_stale(sink: OutputSink, previous: Dict[str, Dict], current: Dict[str, Dict], stats: WriteStats, force: bool = False):
+    """
+    Deletes files listed in the previous manifest that this run no longer
+    generates, e.g. artifacts of entities removed from the PUML.
+    """
+    for rel, entry in previous.items():
+        if rel in current:
+            continue
+        st = sink.stat(rel)
+        if st is None:
+            continue
+        if force or _unchanged_since(sink, rel, st, entry):
+            sink.delete(rel)
+            stats.count(rel, ARTIFACT_DELETED)
+        else:
+            stats.count(rel, ARTIFACT_KEPT)
+
+# ------------------ Render cache ------------------
+
+RENDER_CACHE_MAX_BYTES = 256 << 20
+
+
+def cache_root() -> Path:
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return Path(base) / 'parser-toolbox'
+
+
+def default_cache_dir() -> Path:
+    return cache_root() / 'render'
+
+
+_generator_hash: Optional[str] = None
+
+
+def generator_hash() -> str:
+    """
+    Hash of this file, so cached output never outlives a renderer change.
+    """
+    global _generator_hash
+    if _generator_hash is None:
+        with open(__file__, 'rb') as f:
+            _generator_hash = hashlib.sha256(f.read()).hexdigest()
+    return _generator_hash
+
+
+class RenderCache:
+    """
+    Content-addressed cache of rendered artifacts that persists across runs.
+    The key is the template hash plus the model fragment hash (which covers
+    the entity, its resolved relations and options like use_lombok). Hits
+    refresh the file mtime; prune() drops the least recently used entries
+    once the cache grows past `max_bytes`. Safe to share between processes.
+    """
+
+    def __init__(self, root: Optional[Path] = None, max_bytes: int = RENDER_CACHE_MAX_BYTES):
+        self.root = Path(root) if root is not None else default_cache_dir()
+        self.max_bytes = max_bytes
+        self.salt = generator_hash()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, template_hash: str, fragment: str) -> str:
+        key = fragment_hash(self.salt, template_hash, fragment)
+        return os.path.join(self.root, key[:2], key[2:])
+
+    def get(self, template_hash: str, fragment: str, render) -> bytes:
+        path = self._path(template_hash, fragment)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            pass  # missing, or not readable for us: render it
+        else:
+            try:
+                os.utime(path)
+            except OSError:
+                pass  # an entry of another user or a read-only cache stays unrefreshed
+            self.hits += 1
+            return data
+        self.misses += 1
+        data = render()
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            pass  # a read-only or full cache only costs speed
+        return data
+
+    def drain(self) -> Tuple[int, int]:
+        """
+        Returns and resets the hit / miss counters (used by worker processes).
+        """
+        counts = self.hits, self.misses
+        self.hits = self.misses = 0
+        return counts
+
+    def prune(self):
+        entries = []
+        total = 0
+        # other processes may prune (or write) at the same time, and a shared
+        # cache may hold entries we cannot delete: skip whatever fails
+        try:
+            buckets = list(os.scandir(self.root))
+        except OSError:
+            return
+        for bucket in buckets:
+            try:
+                files = list(os.scandir(bucket.path)) if bucket.is_dir() else []
+            except OSError:
+                continue
+            for entry in files:
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, entry.path))
+                total += st.st_size
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass  # pruned by another process
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+# ------------------ Template engine ------------------
+
+class TemplateError(ValueError):
+    pass
+
+
+# (required, allowed) placeholders of the templates rendered with values;
+# application.properties and the README are copied as they are
+TEMPLATE_PLACEHOLDERS = {
+    'entity': ({'package', 'ClassName', 'fields'},
+               {'package', 'ClassName', 'fields', 'getters_setters', 'extra_imports', 'lombok_annotations', 'class_name_lower',
+                'use_lombok', 'entity', 'attributes', 'relations'}),
+    'repository': ({'pkg', 'entity'}, {'pkg', 'entity'}),
+    'resource': ({'package', 'Entity'}, {'package', 'Entity', 'entity', 'entities'}),
+    'pom': ({'group_id', 'artifact_id'}, {'group_id', 'artifact_id', 'version', 'lombok_dependency', 'lombok_processor', 'use_lombok'}),
+}
+
+# placeholders the built-in partials are rendered with
+PARTIAL_PLACEHOLDERS = {
+    'id_field': set(),
+    'field': {'type', 'name'},
+    'id_accessors': set(),
+    'accessors': {'type', 'name', 'cap'},
+    'relation': {'type', 'target', 'name', 'mapped_by', 'join_column', 'join_table'},
+}
+
+# a control tag alone on its line takes the whole line with it (includes
+# produce content, so their line is kept)
+TAG_RE = re.compile(r'^[ \t]*\{%(?!\s*include\b)\s*((?:[^%]|%(?!\}))*?)\s*%\}[ \t]*(?:\n|\Z)|\{%\s*((?:[^%]|%(?!\}))*?)\s*%\}', re.M)
+TPL_NAME_RE = re.compile(r'[A-Za-z]\w*(?:\.[A-Za-z]\w*)*$')
+TPL_IF_RE = re.compile(r'(not\s+)?([\w.]+)(?:\s*(==|!=)\s*("[^"]*"|\'[^\']*\'|-?\d+))?$')
+TPL_FOR_RE = re.compile(r'for\s+(\w+)\s+in\s+([\w.]+)$')
+TPL_INCLUDE_RE = re.compile(r'include\s+(?:"([\w.-]+)"|\'([\w.-]+)\'|([\w.-]+))((?:\s+with(?:\s+\w+=[\w.]+)+)?)$')
+TPL_BLOCK_RE = re.compile(r'block\s+(\w+)$')
+
+
+class CompiledTemplate:
+    """
+    A template compiled once into a Python function. Literal segments and
+    placeholders become one f-string, conditionals conditional expressions,
+    loops list comprehensions and includes direct calls of the compiled
+    partials, so rendering does no parsing at all. `render(**values)` is
+    the function itself; `placeholders` are the names it needs.
+    """
+    __slots__ = ('name', 'source_hash', 'placeholders', 'code', 'partials', 'render')
+
+    def __init__(self, name: str, source_hash: str, placeholders: FrozenSet[str], code, partials: Optional[Dict[str, 'CompiledTemplate']] = None):
+        self.name = name
+        self.source_hash = source_hash
+        self.placeholders = placeholders
+        self.code = code
+        self.partials = partials or {}
+        namespace = {f"_p{i}": p.render for i, p in enumerate(self.partials.values())}
+        exec(code, namespace)
+        self.render = namespace['render']
+
+    def dumps(self) -> bytes:
+        partials = tuple((n, p.dumps()) for n, p in self.partials.items())
+        return marshal.dumps((self.name, self.source_hash, tuple(sorted(self.placeholders)), self.code, partials))
+
+    @classmethod
+    def loads(cls, data: bytes) -> 'CompiledTemplate':
+        name, source_hash, placeholders, code, partials = marshal.loads(data)
+        return cls(name, source_hash, frozenset(placeholders), code, {n: cls.loads(p) for n, p in partials})
+
+    def __reduce__(self):
+        # code objects do not pickle, worker processes get the marshalled form
+        return CompiledTemplate.loads, (self.dumps(),)
+
+
+class _TemplateCompiler:
+    """
+    Turns template source into one Python expression. Syntax on top of
+    str.format placeholders ({name}, {a.b}, {name!r:spec}, {{ }}):
+
+        {% if x %} {% elif x == "v" %} {% else %} {% endif %}   (also not x, !=)
+        {% for item in items %} ... {% endfor %}
+        {% include "partial" %}  /  {% include "partial" with a=b.c %}
+        {% block name %} default {% endblock %}   (a partial of that name replaces it)
+    """
+
+    def __init__(self, name: str, partials: Dict[str, CompiledTemplate]):
+        self.name = name
+        self.partials = partials
+        self.used: Dict[str, CompiledTemplate] = {}
+        self.free: Set[str] = set()
+
+    def error(self, message: str):
+        raise TemplateError(f"{self.name}: {message}")
+
+    def tokens(self, source: str) -> List[Tuple[str, str]]:
+        tokens = []
+        pos = 0
+        for m in TAG_RE.finditer(source):
+            if m.start() > pos:
+                tokens.append(('text', source[pos:m.start()]))
+            tokens.append(('tag', m.group(1) if m.group(1) is not None else m.group(2)))
+            pos = m.end()
+        if pos < len(source):
+            tokens.append(('text', source[pos:]))
+        return tokens
+
+    def ref(self, dotted: str, bound: FrozenSet[str]) -> str:
+        if not TPL_NAME_RE.match(dotted) or any(keyword.iskeyword(p) for p in dotted.split('.')):
+            self.error(f"unsupported placeholder {{{dotted}}}")
+        root = dotted.split('.', 1)[0]
+        if root not in bound:
+            self.free.add(root)
+        return dotted
+
+    def text(self, text: str, bound: FrozenSet[str]) -> List[str]:
+        pieces = []
+        try:
+            parsed = list(string.Formatter().parse(text))
+        except ValueError as e:
+            self.error(str(e))
+        for literal, field_name, spec, conversion in parsed:
+            if literal:
+                pieces.append(repr(literal))
+            if field_name is None:
+                continue
+            if spec and any(c in spec for c in '{\'"\\'):
+                self.error(f"unsupported format spec in {{{field_name}:{spec}}}")
+            slot = self.ref(field_name, bound) + (f"!{conversion}" if conversion else '') + (f":{spec}" if spec else '')
+            pieces.append(f"f'{{{slot}}}'")
+        return pieces
+
+    def include(self, name: str, args: str, bound: FrozenSet[str]) -> str:
+        partial = self.partials.get(name)
+        if partial is None:
+            self.error(f"unknown partial {name!r}")
+        alias = f"_p{list(self.used).index(name) if name in self.used else len(self.used)}"
+        self.used.setdefault(name, partial)
+        given = dict(arg.split('=', 1) for arg in args.split()[1:]) if args else {}
+        for placeholder in given:
+            if keyword.iskeyword(placeholder):
+                self.error(f"unsupported include argument {placeholder}=")
+        kwargs = []
+        for placeholder in sorted(partial.placeholders | set(given)):
+            kwargs.append(f"{placeholder}={self.ref(given.get(placeholder, placeholder), bound)}")
+        return f"{alias}({', '.join(kwargs)})"
+
+    def condition(self, expr: str, bound: FrozenSet[str]) -> str:
+        m = TPL_IF_RE.match(expr)
+        if not m:
+            self.error(f"unsupported condition {{% if {expr} %}}")
+        negate, operand, op, literal = m.groups()
+        code = self.ref(operand, bound)
+        if op:
+            code = f"{code} {op} {literal!s}"
+        return f"(not {code})" if negate else f"({code})"
+
+    def parse(self, tokens, i: int, bound: FrozenSet[str], ends: Tuple[str, ...]) -> Tuple[str, int, Optional[str]]:
+        """
+        Compiles tokens[i:] up to one of the `ends` tags. Returns the
+        expression, the index after the end tag and the end tag.
+        """
+        parts: List[List[str]] = []   # runs of implicitly concatenated literals, or single expressions
+
+        def add(piece: List[str], literal: bool):
+            if literal and parts and parts[-1] and parts[-1][0] != '(':
+                parts[-1].extend(piece)
+            elif piece:
+                parts.append(piece if literal else ['(', *piece])
+
+        while i < len(tokens):
+            kind, value = tokens[i]
+            i += 1
+            if kind == 'text':
+                add(self.text(value, bound), True)
+                continue
+            word = value.split(None, 1)[0] if value else ''
+            if word in ends:
+                return self.join(parts), i, value
+            if word == 'if':
+                branches = []
+                cond, tag = value[2:].strip(), 'if'
+                while True:
+                    body, i, tag = self.parse(tokens, i, bound, ('elif', 'else', 'endif'))
+                    branches.append((self.condition(cond, bound), body))
+                    if tag is None or not tag.startswith('elif'):
+                        break
+                    cond = tag[4:].strip()
+                otherwise = "''"
+                if tag == 'else':
+                    otherwise, i, tag = self.parse(tokens, i, bound, ('endif',))
+                if tag != 'endif':
+                    self.error("{% if %} without {% endif %}")
+                for cond, body in reversed(branches):
+                    otherwise = f"({body} if {cond} else {otherwise})"
+                add([otherwise], False)
+            elif word == 'for':
+                m = TPL_FOR_RE.match(value)
+                if not m:
+                    self.error(f"unsupported loop {{% {value} %}}")
+                var, seq = m.groups()
+                seq = self.ref(seq, bound)
+                body, i, tag = self.parse(tokens, i, bound | {var}, ('endfor',))
+                if tag != 'endfor':
+                    self.error("{% for %} without {% endfor %}")
+                add([f"''.join([{body} for {var} in {seq}])"], False)
+            elif word == 'include':
+                m = TPL_INCLUDE_RE.match(value)
+                if not m:
+                    self.error(f"unsupported include {{% {value} %}}")
+                add([self.include(m.group(1) or m.group(2) or m.group(3), m.group(4).strip(), bound)], False)
+            elif word == 'block':
+                m = TPL_BLOCK_RE.match(value)
+                if not m:
+                    self.error(f"unsupported block {{% {value} %}}")
+                state = set(self.free), dict(self.used)
+                body, i, tag = self.parse(tokens, i, bound, ('endblock',))
+                if tag != 'endblock':
+                    self.error("{% block %} without {% endblock %}")
+                if m.group(1) in self.partials:
+                    # overridden: the default body does not count
+                    self.free, self.used = state
+                    add([self.include(m.group(1), '', bound)], False)
+                else:
+                    add([body], False)
+            else:
+                self.error(f"unknown tag {{% {value} %}}")
+        if ends:
+            self.error(f"missing {{% {ends[-1]} %}}")
+        return self.join(parts), i, None
+
+    @staticmethod
+    def join(parts: List[List[str]]) -> str:
+        exprs = [' '.join(p[1:]) if p[0] == '(' else '(' + ' '.join(p) + ')' for p in parts]
+        if not exprs:
+            return "''"
+        if len(exprs) == 1:
+            return exprs[0]
+        return f"''.join(({', '.join(exprs)},))"
+
+    def compile(self, source: str) -> CompiledTemplate:
+        body, _, _ = self.parse(self.tokens(source), 0, frozenset(), ())
+        args = ', '.join(['*'] + sorted(self.free) + ['**_'] if self.free else ['**_'])
+        try:
+            code = compile(f"def render({args}):\n    return {body}\n", f"<template {self.name}>", 'exec')
+        except (SyntaxError, ValueError) as e:
+            # input the tag patterns let through, e.g. a literal ending in a backslash
+            self.error(f"cannot compile template: {e.msg if isinstance(e, SyntaxError) else e}")
+        source_hash = fragment_hash(source)
+        if self.used:
+            source_hash = fragment_hash(source_hash, [(n, p.source_hash) for n, p in self.used.items()])
+        return CompiledTemplate(self.name, source_hash, frozenset(self.free), code, dict(self.used))
+
+
+@lru_cache(maxsize=128)
+def _compile_template(source: str, name: str, partials: Tuple[Tuple[str, CompiledTemplate], ...]) -> CompiledTemplate:
+    return _TemplateCompiler(name, dict(partials)).compile(source)
+
+
+def compile_template(source: str, name: str = '<template>', partials: Optional[Dict[str, CompiledTemplate]] = None) -> CompiledTemplate:
+    """
+    Compiles `source`; includes and blocks are resolved against `partials`.
+    """
+    return _compile_template(source, name, tuple(sorted(partials.items())) if partials else ())
+
+
+def template_includes(source: str) -> Set[str]:
+    names = set()
+    for m in TAG_RE.finditer(source):
+        tag = m.group(1) if m.group(1) is not None else m.group(2)
+        inc = TPL_INCLUDE_RE.match(tag) or TPL_BLOCK_RE.match(tag)
+        if inc:
+            names.add(next(g for g in inc.groups() if g))
+    return names
+
+
+def compile_partials(sources: Dict[str, object]) -> Dict[str, CompiledTemplate]:
+    """
+    Compiles partials (which may include each other) and validates the
+    built-in ones against PARTIAL_PLACEHOLDERS.
+    """
+    compiled: Dict[str, CompiledTemplate] = {}
+
+    def build(name: str, stack: Tuple[str, ...]):
+        if name in compiled:
+            return
+        if name in stack:
+            raise TemplateError(f"partials/{name}.tpl: include cycle {' -> '.join(stack + (name,))}")
+        source = sources[name]
+        if isinstance(source, CompiledTemplate):
+            compiled[name] = source
+            return
+        deps = template_includes(source) & sources.keys()
+        for dep in sorted(deps):
+            build(dep, stack + (name,))
+        compiled[name] = compile_template(source, f"partials/{name}.tpl", {d: compiled[d] for d in deps})
+
+    for name in sources:
+        build(name, ())
+    for name, allowed in PARTIAL_PLACEHOLDERS.items():
+        validate_template(compiled[name], set(), allowed)
+    return compiled
+
+
+@lru_cache(maxsize=1)
+def default_partials() -> Dict[str, CompiledTemplate]:
+    return compile_partials(DEFAULT_PARTIALS)
+
+
+def as_template(tpl) -> CompiledTemplate:
+    return tpl if isinstance(tpl, CompiledTemplate) else compile_template(tpl)
+
+
+def template_hash(tpl) -> str:
+    """
+    Same value for a template's source text and its compiled form.
+    """
+    return tpl.source_hash if isinstance(tpl, CompiledTemplate) else fragment_hash(tpl)
+
+
+def validate_template(tpl: CompiledTemplate, required: Set[str], allowed: Set[str]):
+    unknown = tpl.placeholders - allowed
+    if unknown:
+        raise TemplateError(f"{tpl.name}: unknown placeholder(s) {', '.join(sorted(unknown))} "
+                            f"(available: {', '.join(sorted(allowed))})")
+    missing = required - tpl.placeholders
+    if missing:
+        raise TemplateError(f"{tpl.name}: missing placeholder(s) {', '.join(sorted(missing))}")
+
+
+def compile_templates(templates: Dict[str, object]) -> Dict[str, object]:
+    """
+    Compiles and validates every template that takes placeholders, so a
+    broken custom template fails before anything is written. Partials
+    missing from templates['partials'] fall back to the built-in ones.
+    """
+    compiled = dict(templates)
+    sources = dict(DEFAULT_PARTIALS)
+    sources.update(templates.get('partials') or {})
+    partials = compiled['partials'] = compile_partials(sources) if sources != DEFAULT_PARTIALS else default_partials()
+    for key, (required, allowed) in TEMPLATE_PLACEHOLDERS.items():
+        tpl = compiled[key]
+        if not isinstance(tpl, CompiledTemplate):
+            tpl = compile_template(tpl, TEMPLATE_FILES[key][0], partials)
+        validate_template(tpl, required, allowed)
+        compiled[key] = tpl
+    return compiled
 
+
+def template_cache_dir() -> Path:
+    return cache_root() / 'templates'
+
+
+_compiled_templates: Dict[str, CompiledTemplate] = {}
+
+
+def load_compiled_template(path: Path, key: str, partials: Optional[Dict[str, CompiledTemplate]] = None, cache_dir: Optional[Path] = None) -> CompiledTemplate:
+    """
+    Loads a template file in compiled form. The compiled code is cached
+    under the file's path, mtime and size (and the partials it may include),
+    so unchanged templates are neither read nor compiled again. The cache
+    lives in memory; with `cache_dir` it is also kept on disk there, so
+    later processes reuse it (the CLI passes template_cache_dir()).
+    """
+    partials = partials or {}
+    st = os.stat(path)
+    cache_key = fragment_hash(os.path.abspath(path), st.st_mtime_ns, st.st_size, generator_hash(), sys.version,
+                              sorted((n, p.source_hash) for n, p in partials.items()))
+    tpl = _compiled_templates.get(cache_key)
+    if tpl is None and cache_dir is not None:
+        try:
+            tpl = CompiledTemplate.loads((Path(cache_dir) / cache_key).read_bytes())
+        except (OSError, ValueError, EOFError, TypeError):
+            pass
+    if tpl is None:
+        tpl = compile_template(Path(path).read_text(), Path(path).name, partials)
+        if cache_dir is not None:
+            try:
+                Path(cache_dir).mkdir(parents=True, exist_ok=True)
+                fd, tmp = tempfile.mkstemp(dir=cache_dir)
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(tpl.dumps())
+                os.replace(tmp, Path(cache_dir) / cache_key)
+            except OSError:
+                pass
+    validate_template(tpl, *TEMPLATE_PLACEHOLDERS[key])
+    _compiled_templates[cache_key] = tpl
+    return tpl
+
+# ------------------ Model diff ------------------
+
+@dataclass(frozen=True, slots=True)
+class ModelDiff:
+    """
+    What changed between the model of the last run and this one.
+    `entities` need their Entity.java re-rendered (own attributes or relation
+    fields changed, which covers both sides of an added/removed relation);
+    `sql_sections` are the import.sql tables whose rows change.
+    """
+    added: FrozenSet[str]
+    removed: FrozenSet[str]
+    entities: FrozenSet[str]
+    sql_sections: FrozenSet[str]
+
+
+def _join_table_key(jt: Optional[JoinTable]):
+    return jt and (jt.name, jt.join_column, jt.inverse_join_column, jt.owner, jt.inverse)
+
+
+def model_snapshot(model: ResolvedModel, options: str, seed: str = '') -> Dict:
+    """
+    Compact per-entity fingerprint of the resolved model, stored in the
+    manifest so the next run can diff against it. Hashes plain tuples
+    rather than dataclass reprs, which are much slower to build. `seed`
+    fingerprints the import.sql options, which only affect import.sql.
+    """
+    entities = {}
+    for name, rent in model.entities.items():
+        attrs = [(a.name, a.type) for a in rent.entity.attrs]
+        fields = [(f.type, f.target, f.name, f.mapped_by, f.join_column, _join_table_key(f.join_table)) for f in rent.fields]
+        entities[name] = {
+            'attrs': fragment_hash(name, attrs),
+            'fields': fragment_hash(fields),
+            'sql': fragment_hash(rent.table, attrs, rent.foreign_key),
+        }
+    return {
+        'options': options,
+        'seed': seed,
+        'entities': entities,
+        'join_tables': [[jt.name, fragment_hash(_join_table_key(jt))] for jt in model.join_tables],
+    }
+
+
+def diff_models(previous: Optional[Dict], current: Dict) -> Optional[ModelDiff]:
+    """
+    Returns None when there is nothing usable to diff against (first run,
+    other options), meaning everything has to be looked at.
+    """
+    if not previous or previous.get('options') != current['options']:
+        return None
+    prev_entities = previous.get('entities', {})
+    cur_entities = current['entities']
+
+    added = frozenset(cur_entities.keys() - prev_entities.keys())
+    removed = frozenset(prev_entities.keys() - cur_entities.keys())
+    entities = set(added)
+    sql_sections = set()
+    for name, cur in cur_entities.items():
+        prev = prev_entities.get(name)
+        if prev is None:
+            sql_sections.add(name.lower())
+            continue
+        if prev['attrs'] != cur['attrs'] or prev['fields'] != cur['fields']:
+            entities.add(name)
+        if prev['sql'] != cur['sql']:
+            sql_sections.add(name.lower())
+    sql_sections.update(name.lower() for name in removed)
+
+    prev_jts = Counter(tuple(jt) for jt in previous.get('join_tables', []))
+    cur_jts = Counter(tuple(jt) for jt in current['join_tables'])
+    sql_sections.update(name for name, _ in (prev_jts - cur_jts) + (cur_jts - prev_jts))
+
+    return ModelDiff(added, removed, frozenset(entities), frozenset(sql_sections))
+
+# ------------------ Main generator ------------------
+
+SQL_INSERT_RE = re.compile(r"INSERT INTO (\S+) ")
+
+
+class SqlSections:
+    """
+    The per-table sections of a previously generated import.sql. The lines
+    go to a spooled temporary file (on disk once it grows past
+    SPOOL_MAX_SIZE), so reusing the sections of a big seed file does not
+    hold them in memory. `sections[table]` iterates over the lines.
+    """
+
+    def __init__(self, lines: Iterable[str]):
+        self._file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        self._spans: Dict[str, List[Tuple[int, int]]] = {}
+        pos = 0
+        for line in lines:
+            m = SQL_INSERT_RE.match(line)
+            if not m:
+                continue
+            data = line.rstrip('\n').encode('utf-8') + b'\n'
+            self._file.write(data)
+            spans = self._spans.setdefault(m.group(1), [])
+            if spans and spans[-1][1] == pos:
+                spans[-1] = (spans[-1][0], pos + len(data))
+            else:
+                spans.append((pos, pos + len(data)))
+            pos += len(data)
+
+    def tables(self) -> List[str]:
+        return list(self._spans)
+
+    def drop(self, tables: Iterable[str]):
+        for table in tables:
+            self._spans.pop(table, None)
+
+    def __contains__(self, table: str) -> bool:
+        return table in self._spans
+
+    def __getitem__(self, table: str) -> Iterator[str]:
+        f = self._file
+        for start, end in self._spans[table]:
+            f.seek(start)
+            while f.tell() < end:
+                yield f.readline().decode('utf-8').rstrip('\n')
+
+
+def read_sql_sections(sink: OutputSink, rel: str) -> SqlSections:
+    """
+    Splits a previously generated import.sql into its per-table sections.
+    """
+    return SqlSections(sink.iter_lines(rel))
+
+
+SEED_FORMATS = ('sql', 'csv', 'copy')
+SEED_DIR = 'seed'
+SEED_DISTRIBUTIONS = ('uniform', 'normal', 'zipf')
+SEED_BLOCK_ROWS = 4096          # rows generated per column at a time
+ZIPF_EXPONENT = 1.1
+
+
+def check_distribution(spec: str):
+    """
+    Accepts 'uniform', 'normal', 'zipf' and 'zipf:<exponent>'.
+    """
+    kind, _, param = spec.partition(':')
+    if kind not in SEED_DISTRIBUTIONS or (param and kind != 'zipf'):
+        raise ValueError(f"unknown distribution: {spec} (use {', '.join(SEED_DISTRIBUTIONS)} or zipf:<exponent>)")
+    if param:
+        try:
+            if float(param) <= 0:
+                raise ValueError
+        except ValueError:
+            raise ValueError(f"zipf exponent must be a positive number: {spec}") from None
+
+
+@dataclass(frozen=True, slots=True)
+class SeedOptions:
+    """
+    Shape of the seed data. `batch_size` rows of a table share one
+    multi-row INSERT statement (1 = one statement per row). Every entity
+    gets `rows` rows unless `entity_rows` ((name, rows) pairs) says
+    otherwise. `format` 'sql' writes import.sql; 'csv' and 'copy' write one
+    CSV / COPY FROM STDIN file per table to seed/ plus a psql loader.
+    `seed` makes the values repeatable (a random one per run if None).
+    Numeric columns follow `distribution`; `column_distributions`
+    (('Entity.attr', spec) pairs) sets it per column, which for a foreign
+    key column replaces the default round robin over the referenced rows.
+    """
+    batch_size: int = 1
+    rows: int = 1
+    entity_rows: Tuple[Tuple[str, int], ...] = ()
+    format: str = 'sql'
+    seed: Optional[int] = None
+    distribution: str = 'uniform'
+    column_distributions: Tuple[Tuple[str, str], ...] = ()
+
+    def __post_init__(self):
+        counts = [('batch size', self.batch_size), ('seed rows', self.rows)]
+        counts += [(f"seed rows of {ename}", rows) for ename, rows in self.entity_rows]
+        for what, n in counts:
+            # bool is an int, but True is not a row count
+            if not isinstance(n, int) or isinstance(n, bool) or n < 1:
+                raise ValueError(f"{what} must be an integer >= 1, not {n!r}")
+        if self.format not in SEED_FORMATS:
+            raise ValueError(f"unknown seed format: {self.format} (use {', '.join(SEED_FORMATS)})")
+        check_distribution(self.distribution)
+        for _, spec in self.column_distributions:
+            check_distribution(spec)
+
+    def column_distribution(self, ename: str, attr: str) -> Optional[str]:
+        key = f"{ename}.{attr}"
+        for column, spec in self.column_distributions:
+            if column == key:
+                return spec
+        return None
+
+    def rows_for(self, ename: str) -> int:
+        for name, rows in self.entity_rows:
+            if name == ename:
+                return rows
+        return self.rows
+
+
+class ColumnEngine:
+    """
+    Generates seed values a column at a time. Every column (`key`, e.g.
+    'order.amount') has its own random stream derived from `seed`, so its
+    values only depend on the seed and the row, not on which other tables
+    are generated. With NumPy the columns are computed as arrays; the
+    stdlib path seeds the same Mersenne Twister streams (NumPy's
+    RandomState with random.Random's init_by_array key) and applies the
+    same formulas, so both give the same values for the same seed (normal
+    columns up to the last bit of log / cos).
+    """
+
+    def __init__(self, seed: int, use_numpy: bool = True):
+        self.seed = seed
+        self._np = numpy if use_numpy else None
+        self._streams = {}
+
+    def _uniform(self, key: str, count: int):
+        stream = self._streams.get(key)
+        if stream is None:
+            n = int.from_bytes(hashlib.sha256(f"{self.seed}\x00{key}".encode('utf-8')).digest()[:16], 'little')
+            if self._np is not None:
+                # random.Random(n) seeds with the 32-bit words of n, high zero words dropped
+                words = [(n >> shift) & 0xffffffff for shift in range(0, max(n.bit_length(), 1), 32)]
+                stream = self._np.random.RandomState(words)
+            else:
+                stream = random.Random(n)
+            self._streams[key] = stream
+        if self._np is not None:
+            return stream.random_sample(count)
+        r = stream.random
+        return [r() for _ in range(count)]
+
+    def _draw(self, key: str, spec: str, count: int, low: float, high: float):
+        """
+        `count` values in [low, high): uniform, normal around the middle
+        (clipped, 3 sigma at the bounds) or Zipf-like with the hot values
+        at `low`.
+        """
+        np = self._np
+        kind, _, param = spec.partition(':')
+        # the largest float below `high`: rounding must never reach it
+        top = math.nextafter(high, low)
+        if kind == 'normal':
+            u = self._uniform(key, 2 * count)
+            mean, sd = (low + high) / 2, (high - low) / 6
+            # Box-Muller; 1 - u keeps log() away from 0
+            if np is not None:
+                z = np.sqrt(-2.0 * np.log(1.0 - u[0::2])) * np.cos(2.0 * math.pi * u[1::2])
+                return np.clip(mean + sd * z, low, top)
+            return [min(max(mean + sd * math.sqrt(-2.0 * math.log(1.0 - u1)) * math.cos(2.0 * math.pi * u2), low), top)
+                    for u1, u2 in zip(u[0::2], u[1::2])]
+        u = self._uniform(key, count)
+        if kind == 'zipf':
+            # inverse CDF of the density x^-s on [1, span + 1): closed form, no rank table
+            s = float(param or ZIPF_EXPONENT)
+            end, shift = high - low + 1.0, low - 1.0
+            if s == 1.0:
+                if np is not None:
+                    return np.minimum(end ** u + shift, top)
+                return [min(end ** v + shift, top) for v in u]
+            a = 1.0 - s
+            c = end ** a - 1.0
+            if np is not None:
+                return np.minimum((c * u + 1.0) ** (1.0 / a) + shift, top)
+            return [min((c * v + 1.0) ** (1.0 / a) + shift, top) for v in u]
+        span = high - low
+        if np is not None:
+            return np.minimum(low + u * span, top)
+        return [min(low + v * span, top) for v in u]
+
+    def integers(self, key: str, low: int, high: int, count: int, spec: str = 'uniform') -> List[int]:
+        """
+        `count` integers in [low, high].
+        """
+        x = self._draw(key, spec, count, low, high + 1)
+        if self._np is not None:
+            return self._np.floor(x).astype(self._np.int64).tolist()
+        return list(map(math.floor, x))
+
+    def floats(self, key: str, low: float, high: float, count: int, spec: str = 'uniform', ndigits: int = 2) -> List[float]:
+        """
+        `count` floats in [low, high], rounded half up to `ndigits`.
+        """
+        x = self._draw(key, spec, count, low, high)
+        scale = 10.0 ** ndigits
+        if self._np is not None:
+            return (self._np.floor(x * scale + 0.5) / scale).tolist()
+        floor = math.floor
+        return [floor(v * scale + 0.5) / scale for v in x]
+
+
+def seed_engine(options: SeedOptions, rng: Optional[random.Random] = None) -> ColumnEngine:
+    """
+    The engine for `options.seed`; without one, `rng` (or a fresh
+    random.Random) picks the seed of this run.
+    """
+    if options.seed is not None:
+        return ColumnEngine(options.seed)
+    return ColumnEngine((rng if rng is not None else random.Random()).getrandbits(64))
+
+
+def sql_literal(value) -> str:
+    if value is None:
+        return "NULL"
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return str(value)
+
+
+def sql_inserts(table: str, columns: List[str], rows: Iterable[list], batch_size: int = 1) -> Iterator[str]:
+    """
+    INSERT statements for `rows`, `batch_size` rows per statement. Each
+    statement stays on one line so import.sql can be split per table.
+    """
+    head = f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+    batch = []
+    for row in rows:
+        batch.append(f"({', '.join(map(sql_literal, row))})")
+        if len(batch) >= batch_size:
+            yield head + ', '.join(batch) + ';'
+            batch.clear()
+    if batch:
+        yield head + ', '.join(batch) + ';'
+
+
+CSV_QUOTE_RE = re.compile(r'[",\r\n]')
+
+
+def csv_field(value) -> str:
+    """
+    PostgreSQL CSV: an empty unquoted field is NULL, so empty strings are quoted.
+    """
+    if value is None:
+        return ''
+    text = str(value)
+    if not text or CSV_QUOTE_RE.search(text):
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+def csv_lines(rows: Iterable[list]) -> Iterator[str]:
+    for row in rows:
+        yield ','.join(map(csv_field, row))
+
+
+def _entity_columns(rent: ResolvedEntity) -> List[str]:
+    return ["id" if a.name.lower() == "id" else a.name for a in rent.entity.attrs]
+
+
+def _entity_rows(rent: ResolvedEntity, n: int, fk_rows: int, engine: ColumnEngine, options: SeedOptions) -> Iterator[list]:
+    """
+    Sample rows 1..n of one entity with fixed ids, built from columns of
+    SEED_BLOCK_ROWS rows at a time; the foreign key cycles through the
+    `fk_rows` rows of the referenced entity unless it has a distribution.
+    """
+    ename = rent.entity.name
+    fk_column = f"{rent.foreign_key.lower()}_id" if rent.foreign_key else None
+    for start in range(1, n + 1, SEED_BLOCK_ROWS):
+        ids = range(start, min(start + SEED_BLOCK_ROWS, n + 1))
+        count = len(ids)
+        columns = []
+
+        for a in rent.entity.attrs:
+            attr, typ = a.name, a.type
+            key = f"{rent.table}.{attr.lower()}"
+            spec = options.column_distribution(ename, attr)
+            if attr.lower() == "id":
+                columns.append(ids)
+                continue
+
+            if attr.lower() == fk_column:
+                if spec is not None:
+                    columns.append(engine.integers(key, 1, fk_rows, count, spec))
+                else:
+                    columns.append([(i - 1) % fk_rows + 1 for i in ids])
+                continue
+
+            if typ.lower() in ["string", "varchar", "text"]:
+                columns.append([f"{ename}_{i}" for i in ids])
+            elif typ.lower() in ["int", "integer"]:
+                columns.append(engine.integers(key, 1, 100, count, spec or options.distribution))
+            elif typ.lower() in ["double", "float"]:
+                columns.append(engine.floats(key, 1.0, 100.0, count, spec or options.distribution))
+            else:
+                columns.append([None] * count)
+
+        if columns:
+            yield from map(list, zip(*columns))
+        else:
+            yield from ([] for _ in ids)
+
+
+def _fk_rows(rent: ResolvedEntity, options: SeedOptions) -> int:
+    return options.rows_for(rent.foreign_key) if rent.foreign_key else 1
+
+
+def _join_rows(n: int) -> Iterator[list]:
+    # pairs row i of both sides
+    return ([i, i] for i in range(1, n + 1))
+
+
+def iter_import_sql(model: ResolvedModel, reuse: Optional[SqlSections] = None, rng: Optional[random.Random] = None, options: SeedOptions = SeedOptions()) -> Iterator[str]:
+    """
+    Generiert INSERT Statements für alle Entities mit festen IDs (1,2,3...),
+    inkl. Foreign Keys und ManyToMany Tabellen.
+    Sections (tables) found in `reuse` are copied instead of re-generated.
+    Statements are yielded one by one, so memory does not grow with the
+    number of rows.
+    """
+    engine = seed_engine(options, rng)
+    reuse = reuse or {}
+
+    for ename, rent in model.entities.items():
+        if rent.table in reuse:
+            yield from reuse[rent.table]
+            continue
+        rows = _entity_rows(rent, options.rows_for(ename), _fk_rows(rent, options), engine, options)
+        yield from sql_inserts(rent.table, _entity_columns(rent), rows, options.batch_size)
+
+    reused = set()
+    for jt in model.join_tables:
+        if jt.name in reuse:
+            if jt.name not in reused:
+                yield from reuse[jt.name]
+                reused.add(jt.name)
+            continue
+        rows = _join_rows(min(options.rows_for(jt.owner), options.rows_for(jt.inverse)))
+        yield from sql_inserts(jt.name, [jt.join_column, jt.inverse_join_column], rows, options.batch_size)
+
+
+def generate_import_sql(model: ResolvedModel, reuse: Optional[SqlSections] = None, rng: Optional[random.Random] = None, options: SeedOptions = SeedOptions()) -> str:
+    return "\n".join(iter_import_sql(model, reuse, rng, options))
+
+
+def fk_order(model: ResolvedModel) -> List[str]:
+    """
+    Entity names with every entity after the one its foreign key points
+    to, in model order otherwise. Entities on a foreign key cycle keep the
+    order in which the cycle is found.
+    """
+    order: List[str] = []
+    done: Set[str] = set()
+    for name in model.entities:
+        chain: List[str] = []
+        while name is not None and name not in done and name not in chain:
+            chain.append(name)
+            fk = model.entities[name].foreign_key
+            name = fk if fk in model.entities else None
+        for ename in reversed(chain):
+            done.add(ename)
+            order.append(ename)
+    return order
+
+
+class SeedTable(NamedTuple):
+    table: str
+    columns: List[str]
+    rows: Callable[[ColumnEngine], Iterator[list]]
+    fragment: str
+
+
+def seed_tables(model: ResolvedModel, options: SeedOptions) -> List[SeedTable]:
+    """
+    Every entity table in foreign key order, then every join table once:
+    the load order of the csv / copy seed files.
+    """
+    tables = []
+    for ename in fk_order(model):
+        rent = model.entities[ename]
+        n, fk_rows = options.rows_for(ename), _fk_rows(rent, options)
+        tables.append(SeedTable(
+            rent.table, _entity_columns(rent),
+            lambda engine, rent=rent, n=n, fk_rows=fk_rows: _entity_rows(rent, n, fk_rows, engine, options),
+            fragment_hash(rent.table, [(a.name, a.type) for a in rent.entity.attrs], rent.foreign_key, n, fk_rows)))
+    seen = set()
+    for jt in model.join_tables:
+        if jt.name in seen:
+            continue
+        seen.add(jt.name)
+        n = min(options.rows_for(jt.owner), options.rows_for(jt.inverse))
+        tables.append(SeedTable(
+            jt.name, [jt.join_column, jt.inverse_join_column],
+            lambda engine, n=n: _join_rows(n),
+            fragment_hash(_join_table_key(jt), n)))
+    return tables
+
+
+def seed_file_lines(fmt: str, table: SeedTable, engine: ColumnEngine) -> Iterator[str]:
+    """
+    Lines of one seed file: CSV with a header, or a psql COPY FROM STDIN
+    block. Each file ends with a newline.
+    """
+    if fmt == 'csv':
+        yield ','.join(table.columns)
+        yield from csv_lines(table.rows(engine))
+    else:
+        yield f"COPY {table.table} ({', '.join(table.columns)}) FROM STDIN WITH (FORMAT csv);"
+        yield from csv_lines(table.rows(engine))
+        yield '\\.'
+    yield ''
+
+
+def seed_file_name(fmt: str, index: int, count: int, table: str) -> str:
+    # the number prefix is the load order
+    return f"{index:0{max(2, len(str(count)))}d}_{table}.{'csv' if fmt == 'csv' else 'sql'}"
+
+
+def render_seed_loader(fmt: str, files: List[Tuple[str, SeedTable]]) -> str:
+    lines = [
+        "#!/bin/sh",
+        "# Loads the seed data into PostgreSQL in foreign key order. Arguments go to psql, e.g.",
+        "#   sh seed/load.sh -h localhost -p 5320 -U quarkus quarkus",
+        "set -e",
+        'cd "$(dirname "$0")"',
+        "psql -v ON_ERROR_STOP=1 --single-transaction \"$@\" <<'SQL'",
+    ]
+    for name, table in files:
+        if fmt == 'csv':
+            lines.append(f"\\copy {table.table} ({', '.join(table.columns)}) FROM '{name}' WITH (FORMAT csv, HEADER true)")
+        else:
+            lines.append(f"\\i {name}")
+    lines += ["SQL", ""]
+    return "\n".join(lines)
+
+# dedented once at import instead of on every render
+LOMBOK_POM_DEPENDENCY = textwrap.dedent("""
+    <dependency>
+        <groupId>org.projectlombok</groupId>
+        <artifactId>lombok</artifactId>
+        <version>1.18.42</version>
+        <scope>provided</scope>
+    </dependency>
+""").rstrip()
+
+LOMBOK_POM_PROCESSOR = textwrap.dedent("""
+    <annotationProcessorPaths>
+        <path>
+            <groupId>org.projectlombok</groupId>
+            <artifactId>lombok</artifactId>
+            <version>1.18.42</version>
+        </path>
+    </annotationProcessorPaths>
+""").rstrip()
+
+
+def render_pom_xml(base_pkg: str, artifact: str, tpl: str, use_lombok: bool) -> str:
+
+    lombok_dep = LOMBOK_POM_DEPENDENCY if use_lombok else ""
+    lombok_ap = LOMBOK_POM_PROCESSOR if use_lombok else ""
+
+    pom = as_template(tpl).render(
+        group_id=base_pkg,
+        artifact_id=artifact,
+        version="1.0.0-SNAPSHOT",
+        lombok_dependency=lombok_dep,
+        lombok_processor=lombok_ap,
+        use_lombok=use_lombok
+    )
+
+    return pom
+
+
+def generate_pom_xml(sink, base_pkg: str, artifact: str, tpl: str, use_lombok: bool) -> bool:
+    return as_sink(sink).write('pom.xml', render_pom_xml(base_pkg, artifact, tpl, use_lombok).encode('utf-8'))
+
+# {key: (file name, built-in default)}. The defaults are the same text as the
+# files shipped in src/templates/ (test_templates.py checks), so the library
+# and the command line generate the same project.
+TEMPLATE_FILES = {
+    'entity': ('entity.tpl', DEFAULT_ENTITY_TPL),
+    'repository': ('repository.tpl', DEFAULT_REPO_TPL),
+    'resource': ('resource.tpl', DEFAULT_RESOURCE_TPL),
+    'pom': ('pom.tpl', DEFAULT_POM_TPL),
+    'app': ('application.properties.tpl', DEFAULT_APP_TPL),
+    'readme': ('readme.tpl', DEFAULT_README),
+}
+
+
+PARTIALS_DIR = 'partials'
+
+
+def read_partials(tpl_dir: Path) -> Dict[str, str]:
+    """
+    The built-in partials, overridden (or extended) by the files in
+    templates/partials/.
+    """
+    partials = dict(DEFAULT_PARTIALS)
+    for path in sorted((tpl_dir / PARTIALS_DIR).glob('*.tpl')):
+        partials[path.stem] = path.read_text().removesuffix('\n')
+    return partials
+
+# ------------------ Template registry ------------------
+
+PROJECT_TEMPLATES_DIR = Path(MANIFEST_DIR) / 'templates'
+
+
+def user_templates_dir() -> Path:
+    base = os.environ.get('XDG_CONFIG_HOME') or os.path.join(os.path.expanduser('~'), '.config')
+    return Path(base) / 'parser-toolbox' / 'templates'
+
+
+def template_dirs(puml: Optional[Path] = None, override: Optional[Path] = None) -> List[Path]:
+    """
+    Template override directories, lowest precedence first: the templates
+    shipped next to this file, the user config dir, .parser-toolbox/templates
+    next to the PUML file and finally --templates.
+    """
+    dirs = [Path(__file__).resolve().parent / 'templates', user_templates_dir()]
+    if puml is not None:
+        dirs.append(Path(puml).resolve().parent / PROJECT_TEMPLATES_DIR)
+    if override is not None:
+        dirs.append(Path(override).resolve())
+    return dirs
+
+
+class TemplateRegistry:
+    """
+    Serves the templates: built-in defaults from memory, each one replaced
+    by the file of the same name in the highest-precedence directory that
+    has it. Loaded and compiled templates are kept until refresh() sees a
+    different set of files or mtimes. Nothing is written to `dirs`; compiled
+    templates only go to disk when a `cache_dir` is given.
+    """
+
+    def __init__(self, dirs: Iterable[Path] = (), cache_dir: Optional[Path] = None):
+        self.dirs = [Path(d) for d in dirs]
+        self.cache_dir = cache_dir
+        self._stamp = None
+        self._templates: Optional[Dict[str, object]] = None
+
+    def files(self) -> Dict[str, Tuple[Path, int, int]]:
+        """
+        {key: (path, mtime_ns, size)} of the override files in effect;
+        partials are keyed 'partials/<name>'.
+        """
+        found = {}
+        for d in self.dirs:
+            candidates = [(key, d / fname) for key, (fname, _) in TEMPLATE_FILES.items()]
+            candidates += [(f"{PARTIALS_DIR}/{p.stem}", p) for p in sorted((d / PARTIALS_DIR).glob('*.tpl'))]
+            for key, path in candidates:
+                try:
+                    st = os.stat(path)
+                except (FileNotFoundError, NotADirectoryError):
+                    continue
+                found[key] = (path, st.st_mtime_ns, st.st_size)
+        return found
+
+    def refresh(self) -> bool:
+        """
+        Reloads if an override file was added, removed or modified since
+        the last load. Returns True if it did.
+        """
+        files = self.files()
+        stamp = sorted((key, str(path), mtime, size) for key, (path, mtime, size) in files.items())
+        if stamp == self._stamp and self._templates is not None:
+            return False
+        self._templates = self._load(files, self.cache_dir)
+        self._stamp = stamp
+        return True
+
+    def templates(self) -> Dict[str, object]:
+        if self._templates is None:
+            self.refresh()
+        return self._templates
+
+    def __getitem__(self, key: str):
+        return self.templates()[key]
+
+    @staticmethod
+    def _load(files: Dict[str, Tuple[Path, int, int]], cache_dir: Optional[Path] = None) -> Dict[str, object]:
+        sources = dict(DEFAULT_PARTIALS)
+        for key, (path, _, _) in files.items():
+            if key.startswith(PARTIALS_DIR + '/'):
+                sources[key.split('/', 1)[1]] = path.read_text().removesuffix('\n')
+        partials = default_partials() if sources == DEFAULT_PARTIALS else compile_partials(sources)
+
+        templates = {'partials': partials}
+        for key, (fname, default) in TEMPLATE_FILES.items():
+            path = files[key][0] if key in files else None
+            if key in TEMPLATE_PLACEHOLDERS:
+                templates[key] = load_compiled_template(path, key, partials, cache_dir) if path else compile_template(default, fname, partials)
+            else:
+                templates[key] = path.read_text() if path else default
+        return templates
+
+
+# ------------------ Parallel rendering ------------------
+
+@dataclass(frozen=True, slots=True)
+class RenderContext:
+    """
+    Everything needed to render and write one entity's artifacts. Sent to
+    each worker process once, through the pool initializer (without the
+    sink unless it is `shared`).
+    """
+    base_pkg: str
+    model: ResolvedModel
+    templates: Dict[str, str]
+    template_hashes: Dict[str, str]
+    use_lombok: bool
+    sink: Optional[OutputSink]
+    java_rel: str
+    manifest: Dict[str, Dict]
+    diff: Optional[ModelDiff] = None
+    force: bool = False
+    cache: Optional[RenderCache] = None
+    type_map: Optional[Dict[str, str]] = None
+
+    def dirty(self, ename: str) -> bool:
+        return self.diff is None or ename in self.diff.entities or ename in self.diff.added
+
+
+_worker_ctx: Optional[RenderContext] = None
+
+
+def _init_worker(ctx: RenderContext):
+    global _worker_ctx
+    _worker_ctx = ctx
+
+
+def _entity_artifacts(ctx: RenderContext, ename: str):
+    """
+    (path, template key, changed, fragment, render) for each artifact of an entity.
+    """
+    rent = ctx.model.entities[ename]
+    tpl = ctx.templates
+    diff = ctx.diff
+    return (
+        (f"{ctx.java_rel}/entities/{ename}.java", 'entity',
+         diff is None or ename in diff.entities,
+         lambda: fragment_hash(ctx.base_pkg, ctx.use_lombok, rent),
+         lambda: render_entity(ctx.base_pkg, rent, tpl['entity'], use_lombok=ctx.use_lombok,
+                               partials=tpl['partials'], type_map=ctx.type_map)),
+        (f"{ctx.java_rel}/repositories/{ename}Repository.java", 'repository',
+         diff is None or ename in diff.added,
+         lambda: fragment_hash(ctx.base_pkg, rent.name),
+         lambda: render_repository(ctx.base_pkg, rent, tpl['repository'])),
+        (f"{ctx.java_rel}/resources/{ename}Resource.java", 'resource',
+         diff is None or ename in diff.added,
+         lambda: fragment_hash(ctx.base_pkg, rent.name, rent.var, rent.collection),
+         lambda: render_resource(ctx.base_pkg, rent, tpl['resource'])),
+    )
+
+
+def _write_entity_artifacts(ctx: RenderContext, sink: OutputSink, ename: str, rendered: Optional[Dict[str, Tuple[str, str]]] = None, writer: Optional[ConcurrentWriter] = None) -> List[Tuple[str, str, Dict]]:
+    """
+    `rendered` holds (fragment, content) per path a worker has already
+    rendered; workers skip artifacts the model diff did not touch, so those
+    are rendered here if their file turns out to be missing or edited.
+    """
+    results = []
+    for rel, key, changed, fragment, render in _entity_artifacts(ctx, ename):
+        prev = ctx.manifest.get(rel)
+        if not changed and prev is not None and sink.stat(rel) == (prev['size'], prev['mtime_ns']):
+            # the model diff says the inputs are unchanged and the file is as
+            # the last run left it: keep the manifest entry without reading it.
+            # Deleted or hand-edited files fall through to emit_artifact().
+            results.append((rel, ARTIFACT_SKIPPED, prev))
+            continue
+        if rendered is not None and rel in rendered:
+            frag, content = rendered[rel]
+            status, entry = emit_artifact(sink, rel, prev, ctx.template_hashes[key], frag, lambda: content, ctx.force, writer=writer)
+        else:
+            status, entry = emit_artifact(sink, rel, prev, ctx.template_hashes[key], fragment(), render, ctx.force, ctx.cache, writer)
+        results.append((rel, status, entry))
+    return results
+
+
+def _cache_counts(ctx: RenderContext) -> Tuple[int, int]:
+    return ctx.cache.drain() if ctx.cache is not None else (0, 0)
+
+
+def _worker_write(ename: str) -> Tuple[List[Tuple[str, str, Dict]], Tuple[int, int]]:
+    results = _write_entity_artifacts(_worker_ctx, _worker_ctx.sink, ename)
+    return results, _cache_counts(_worker_ctx)
+
+
+def _worker_render(ename: str) -> Tuple[Dict[str, Tuple[str, bytes]], Tuple[int, int]]:
+    ctx = _worker_ctx
+    rendered = {}
+    for rel, key, changed, fragment, render in _entity_artifacts(ctx, ename):
+        if changed or rel not in ctx.manifest:
+            frag = fragment()
+            rendered[rel] = frag, (ctx.cache.get(ctx.template_hashes[key], frag, render) if ctx.cache is not None else render())
+    return rendered, _cache_counts(ctx)
+
+
+def _add_cache_counts(ctx: RenderContext, counts: Tuple[int, int]):
+    if ctx.cache is not None:
+        ctx.cache.hits += counts[0]
+        ctx.cache.misses += counts[1]
+
+
+def write_entity_artifacts(ctx: RenderContext, jobs: int = 1, writer: Optional[ConcurrentWriter] = None) -> Iterator[Tuple[str, str, Dict]]:
+    """
+    Renders Entity/Repository/Resource for every entity and yields
+    (path, status, manifest entry). With jobs > 1 the entities are spread
+    over a process pool; jobs <= 0 means one per CPU. Workers write to a
+    shared sink themselves, otherwise they render and this process writes,
+    through `writer` if given.
+    """
+    sink = ctx.sink
+    names = [ename for ename in ctx.model.entities if ctx.dirty(ename)]
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(names))
+
+    # entities the model diff did not touch are only checked against the manifest
+    for ename in ctx.model.entities:
+        if not ctx.dirty(ename):
+            yield from _write_entity_artifacts(ctx, sink, ename)
+
+    if jobs <= 1:
+        for ename in names:
+            yield from _write_entity_artifacts(ctx, sink, ename, writer=writer)
+        return
+
+    chunksize = max(1, len(names) // (jobs * 4))
+    worker_ctx = ctx if sink.shared else replace(ctx, sink=None)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(worker_ctx,)) as pool:
+        if sink.shared:
+            for results, counts in pool.map(_worker_write, names, chunksize=chunksize):
+                _add_cache_counts(ctx, counts)
+                yield from results
+            return
+        for ename, (rendered, counts) in zip(names, pool.map(_worker_render, names, chunksize=chunksize)):
+            _add_cache_counts(ctx, counts)
+            yield from _write_entity_artifacts(ctx, sink, ename, rendered, writer)
+
+
+def generate_project(sink, base_pkg: str, entities: Dict[str, Entity], relations_raw: List[RawRelation], templates: Dict[str, str], use_lombok: bool = False, jobs: int = 1, force: bool = False, artifact: Optional[str] = None, rng: Optional[random.Random] = None, cache: Optional[RenderCache] = None, type_map: Optional[Dict[str, str]] = None, write_threads: int = 1, fsync: bool = False, seed_options: SeedOptions = SeedOptions()) -> WriteStats:
+    """
+    Generates the project into `sink` (an OutputSink or a directory)
+    without printing anything. `artifact` defaults to the sink's name;
+    `rng` picks the seed of the sample data unless `seed_options` has one
+    (a fresh random.Random() when not given); `cache` serves entities and pom.xml rendered by earlier runs;
+    `type_map` adds or overrides PUML -> Java attribute types. Files are
+    written serially, or through `write_threads` writer threads (worth it
+    on network mounts, see `benchmark.py writer`); `fsync`
+    syncs everything written in one go at the end. `seed_options` shapes
+    the import.sql seed data.
+    """
+    sink = as_sink(sink)
+    java_rel = '/'.join(['src', 'main', 'java'] + base_pkg.split('.'))
+    # the whole tree at once, instead of a failed write + mkdir per directory
+    sink.makedirs([f"{java_rel}/entities", f"{java_rel}/repositories", f"{java_rel}/resources",
+                   'src/main/resources', MANIFEST_DIR] + ([SEED_DIR] if seed_options.format != 'sql' else []))
+
+    templates = compile_templates(templates)
+    template_hashes = {key: template_hash(tpl) for key, tpl in templates.items() if key != 'partials'}
+    # entities are assembled from the partials as well
+    template_hashes['entity'] = fragment_hash(template_hashes['entity'], sorted((n, p.source_hash) for n, p in templates['partials'].items()))
+    if type_map:
+        template_hashes['entity'] = fragment_hash(template_hashes['entity'], sorted(type_map.items()))
+    group = base_pkg
+    artifact = artifact or sink.name
+
+    # resolve relations once, every generator below reads from the model
+    model = resolve(entities, relations_raw)
+
+    manifest = load_manifest(sink)
+    previous = manifest['files']
+    current: Dict[str, Dict] = {}
+    stats = WriteStats()
+
+    # diff against the model of the last run to find what actually changed
+    options = fragment_hash(base_pkg, use_lombok, artifact, sorted(template_hashes.items()))
+    # default seed options hash to '', so manifests of earlier versions stay valid
+    snapshot = model_snapshot(model, options, fragment_hash(seed_options) if seed_options != SeedOptions() else '')
+    diff = None if force else diff_models(manifest['model'], snapshot)
+    stats.diff = diff
+
+    written: List[str] = []
+    writer = ConcurrentWriter(sink, write_threads) if write_threads > 1 and sink.threadsafe else None
+
+    def record(rel: str, status: str, entry: Dict):
+        current[rel] = entry
+        if status == ARTIFACT_WRITTEN:
+            written.append(rel)
+        if status != ARTIFACT_PENDING:
+            stats.count(rel, status)
+
+    def emit(rel: str, key: Optional[str], fragment: str, render, cache: Optional[RenderCache] = None):
+        record(rel, *emit_artifact(sink, rel, previous.get(rel), template_hashes.get(key, ''), fragment, render, force, cache, writer))
+
+    try:
+        # entities, repositories, resources
+        ctx = RenderContext(base_pkg, model, templates, template_hashes, use_lombok, sink, java_rel, previous, diff, force, cache, type_map)
+        for rel, status, entry in write_entity_artifacts(ctx, jobs=jobs, writer=writer):
+            record(rel, status, entry)
+
+        # pom + app + readme
+        emit('pom.xml', 'pom', fragment_hash(group, artifact, use_lombok),
+             lambda: render_pom_xml(group, artifact, templates['pom'], use_lombok), cache)
+        emit('src/main/resources/application.properties', 'app', fragment_hash(), lambda: templates['app'])
+        sql_rel = 'src/main/resources/import.sql'
+        sql_parts = [[(n, e['sql']) for n, e in snapshot['entities'].items()], snapshot['join_tables']]
+        if snapshot['seed']:
+            sql_parts.append(snapshot['seed'])
+        sql_fragment = fragment_hash(*sql_parts)
+
+        def render_sql():
+            reuse = None
+            # sections written with other seed options (e.g. batch size) are not reused
+            if diff is not None and manifest['model'].get('seed', '') == snapshot['seed']:
+                reuse = read_sql_sections(sink, sql_rel)
+                reuse.drop(diff.sql_sections)
+            # streamed to the sink, a big seed is never in memory as a whole
+            return encode_lines(iter_import_sql(model, reuse=reuse, rng=rng, options=seed_options))
+
+        if seed_options.format == 'sql':
+            emit(sql_rel, None, sql_fragment, render_sql)
+        else:
+            engine = seed_engine(seed_options, rng)
+            tables = seed_tables(model, seed_options)
+            files = [(seed_file_name(seed_options.format, i, len(tables), t.table), t) for i, t in enumerate(tables, 1)]
+            for name, table in files:
+                emit(f"{SEED_DIR}/{name}", None, fragment_hash(table.fragment, snapshot['seed']),
+                     lambda table=table: encode_lines(seed_file_lines(seed_options.format, table, engine)))
+            emit(f"{SEED_DIR}/load.sh", None, fragment_hash(seed_options.format, [(n, t.table, t.columns) for n, t in files]),
+                 lambda: render_seed_loader(seed_options.format, files))
+        emit('README.md', 'readme', fragment_hash(), lambda: templates['readme'])
+
+        if writer is not None:
+            for rel, status, entry in writer.drain():
+                record(rel, status, entry)
+    finally:
+        # also on errors, so no writer thread outlives the run
+        if writer is not None:
+            writer.close()
+
+    remove_stale(sink, previous, current, stats, force)
+    save_manifest(sink, current, snapshot)
+    if fsync:
+        sink.sync(written + [MANIFEST_PATH])
+    if cache is not None:
+        stats.cache_hits, stats.cache_misses = cache.drain()
+        if stats.cache_misses:
+            cache.prune()
+    return stats
+
+
+def generate(project_root, base_pkg: str, entities: Dict[str, Entity], relations_raw: List[RawRelation], registry: 'TemplateRegistry', use_lombok:bool, jobs: int = 1, force: bool = False, cache: bool = True, write_threads: int = 1, fsync: bool = False, seed_options: SeedOptions = SeedOptions()):
+    """
+    CLI wrapper around generate_project() that reports what happened.
+    `project_root` is a directory or an OutputSink.
+    """
+    # the registry keeps loaded templates, e.g. between watch mode runs
+    templates = registry.templates()
+    for ename, _ in seed_options.entity_rows:
+        if ename not in entities:
+            print(f"Warning: --seed-rows {ename}=...: no entity named {ename}")
+    for column, _ in seed_options.column_distributions:
+        ename, _, attr = column.partition('.')
+        if ename not in entities or attr not in {a.name for a in entities[ename].attrs}:
+            print(f"Warning: --distribution {column}=...: no attribute {attr!r} in entity {ename!r}")
+
+    render_cache = RenderCache() if cache else None
+    stats = generate_project(project_root, base_pkg, entities, relations_raw, templates, use_lombok=use_lombok, jobs=jobs, force=force, cache=render_cache, write_threads=write_threads, fsync=fsync, seed_options=seed_options)
+
+    print(f"Project generated at: {project_root}")
+    for line in report_lines(stats, cache=render_cache is not None):
+        print(line)
+    return stats
+
+
+def report_lines(stats: WriteStats, cache: bool = False) -> List[str]:
+    """
+    What a run did, as printed by the CLI and returned by the daemon.
+    """
+    lines = []
+    diff = stats.diff
+    if diff is not None:
+        lines.append(f"Model changes: {len(diff.added)} added, {len(diff.removed)} removed, "
+                     f"{len(diff.entities)} entities and {len(diff.sql_sections)} import.sql sections affected")
+    lines.append(f"Files written: {stats.written}, unchanged (skipped): {stats.skipped}, stale removed: {stats.deleted}")
+    if cache:
+        lines.append(f"Render cache: {stats.cache_hits} hits, {stats.cache_misses} misses")
+    if stats.kept:
+        lines.append(f"Edited by hand, not overwritten (use --force): {', '.join(stats.kept)}")
+    return lines
+
+# ------------------ Library API ------------------
+
+@dataclass(frozen=True, slots=True)
+class GenerateOptions:
+    """
+    Options of one library generation run. `templates` wins over
+    `templates_dir`; without either the built-in default templates are used.
+    Files missing from `templates_dir` fall back to the defaults and nothing
+    is ever written there. `seed` makes the import.sql sample data repeatable.
+    `cache_dir` enables the persistent render cache in that directory.
+    `type_map` adds or overrides PUML -> Java attribute types.
+    `write_threads` > 1 writes files through a thread pool (for network
+    mounts). `fsync` makes the written files durable before returning. `sql_batch_size`
+    rows share one INSERT statement in import.sql. import.sql gets
+    `seed_rows` rows per entity, `entity_seed_rows` ({name: rows}) overrides
+    that for single entities. `seed_format` 'csv' or 'copy' writes seed/
+    files for PostgreSQL instead of import.sql. Numeric seed columns follow
+    `distribution` ('uniform', 'normal', 'zipf', 'zipf:<exponent>'),
+    `column_distributions` ({'Entity.attr': spec}) sets it per column.
+    """
+    base_package: str
+    artifact: Optional[str] = None
+    use_lombok: bool = False
+    jobs: int = 1
+    force: bool = False
+    seed: Optional[int] = None
+    templates: Optional[Dict[str, str]] = None
+    templates_dir: Optional[Path] = None
+    cache_dir: Optional[Path] = None
+    type_map: Optional[Dict[str, str]] = None
+    write_threads: int = 1
+    fsync: bool = False
+    sql_batch_size: int = 1
+    seed_rows: int = 1
+    entity_seed_rows: Optional[Dict[str, int]] = None
+    seed_format: str = 'sql'
+    distribution: str = 'uniform'
+    column_distributions: Optional[Dict[str, str]] = None
+
+    def seed_options(self) -> SeedOptions:
+        """
+        The SeedOptions of this run; raises ValueError for invalid values.
+        """
+        return SeedOptions(self.sql_batch_size, self.seed_rows, tuple(sorted((self.entity_seed_rows or {}).items())),
+                           self.seed_format, self.seed, self.distribution,
+                           tuple(sorted((self.column_distributions or {}).items())))
+
+
+def default_templates() -> Dict[str, object]:
+    templates = {key: default for key, (_, default) in TEMPLATE_FILES.items()}
+    templates['partials'] = dict(DEFAULT_PARTIALS)
+    return templates
+
+
+def read_templates(tpl_dir: Path) -> Dict[str, object]:
+    """
+    Text of the templates in `tpl_dir`; missing files fall back to the
+    built-in defaults.
+    """
+    templates = {'partials': read_partials(tpl_dir)}
+    for key, (fname, default) in TEMPLATE_FILES.items():
+        try:
+            templates[key] = (tpl_dir / fname).read_text()
+        except FileNotFoundError:
+            templates[key] = default
+    return templates
+
+
+def as_model(model_or_text) -> Tuple[Dict[str, Entity], List[RawRelation]]:
+    """
+    Accepts PUML text (str), a path to a PUML file (os.PathLike only, a str
+    is always text), or an already parsed (entities, relations) pair.
+    Raises ValueError if the PUML has neither classes nor relations.
+    """
+    if isinstance(model_or_text, str):
+        entities, relations_raw = parse(model_or_text)
+        source = 'PUML text (file paths must be os.PathLike, e.g. pathlib.Path)'
+    elif isinstance(model_or_text, os.PathLike):
+        entities, relations_raw = collect_model(parse_path(model_or_text))
+        source = os.fspath(model_or_text)
+    else:
+        entities, relations_raw = model_or_text
+        return entities, list(relations_raw)
+    if not entities and not relations_raw:
+        raise ValueError(f"no classes or relations found in {source}")
+    return entities, relations_raw
+
+
+def generate_model(model_or_text, options: GenerateOptions, sink) -> WriteStats:
+    """
+    Entry point for embedding: no prints, no sys.exit, no module-level
+    random state and nothing written outside `sink` (an OutputSink or a
+    directory), so it can be called from several threads at once (for
+    different sinks).
+    """
+    entities, relations_raw = as_model(model_or_text)
+    if options.templates is not None:
+        templates = options.templates
+    elif options.templates_dir is not None:
+        templates = TemplateRegistry([options.templates_dir]).templates()
+    else:
+        templates = default_templates()
+    return generate_project(as_sink(sink), options.base_package, entities, relations_raw, templates,
+                            use_lombok=options.use_lombok, jobs=options.jobs, force=options.force,
+                            artifact=options.artifact, rng=random.Random(options.seed),
+                            cache=RenderCache(options.cache_dir) if options.cache_dir is not None else None,
+                            type_map=options.type_map, write_threads=options.write_threads, fsync=options.fsync,
+                            seed_options=options.seed_options())
+
+# ------------------ Watch mode ------------------
+
+WATCH_DEBOUNCE = 0.02
+WATCH_POLL_INTERVAL = 0.05
+
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+INOTIFY_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+INOTIFY_EVENT = struct.Struct('iIII')
+
+
+class InotifyWatcher:
+    """
+    Linux inotify through ctypes. Watches directories rather than files, so
+    editors that save by writing a new file and renaming it are seen too.
+    """
+
+    def __init__(self, dirs: Iterable[Path]):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.dirs = {}
+        for d in dirs:
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(d), INOTIFY_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                os.close(self.fd)
+                raise OSError(err, f'inotify_add_watch failed for {d}')
+            self.dirs[wd] = Path(d)
+
+    def wait(self, timeout: Optional[float] = None) -> Set[Path]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        changed = set()
+        if not ready:
+            return changed
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(buf):
+                wd, _, _, length = INOTIFY_EVENT.unpack_from(buf, offset)
+                offset += INOTIFY_EVENT.size
+                name = buf[offset:offset + length].rstrip(b'\0')
+                offset += length
+                if wd in self.dirs and name:
+                    changed.add(self.dirs[wd] / os.fsdecode(name))
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """
+    Fallback for platforms without inotify: compares mtime and size of the
+    watched files every WATCH_POLL_INTERVAL seconds.
+    """
+
+    def __init__(self, files: Iterable[Path]):
+        self.files = list(files)
+        self.state = {f: self._stat(f) for f in self.files}
+
+    @staticmethod
+    def _stat(path: Path):
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def wait(self, timeout: Optional[float] = None) -> Set[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed = set()
+            for f in self.files:
+                st = self._stat(f)
+                if st != self.state[f]:
+                    self.state[f] = st
+                    changed.add(f)
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+            time.sleep(WATCH_POLL_INTERVAL)
+
+    def close(self):
+        pass
+
+
+def make_watcher(puml: Path, registry: TemplateRegistry):
+    dirs = [d for tpl_dir in registry.dirs for d in (tpl_dir, tpl_dir / PARTIALS_DIR) if d.is_dir()]
+    try:
+        return InotifyWatcher({puml.parent, *dirs})
+    except (OSError, AttributeError, TypeError):
+        files = [puml] + [tpl_dir / fname for tpl_dir in registry.dirs for fname, _ in TEMPLATE_FILES.values()]
+        files += [p for d in dirs for p in sorted(d.glob('*.tpl'))]
+        return PollingWatcher(files)
+
+
+def watch(puml: Path, project_root: Path, base_pkg: str, registry: TemplateRegistry, use_lombok: bool = False, jobs: int = 1, force: bool = False, cache: bool = True, write_threads: int = 1, fsync: bool = False, seed_options: SeedOptions = SeedOptions()):
+    """
+    Keeps the process warm: templates and the parsed model stay in memory,
+    and every save of the PUML file or a template triggers an incremental
+    regeneration.
+    """
+    puml = puml.resolve()
+
+    entities, relations_raw = collect_model(parse_path(puml))
+    generate(project_root, base_pkg, entities, relations_raw, registry, use_lombok, jobs=jobs, force=force, cache=cache, write_threads=write_threads, fsync=fsync, seed_options=seed_options)
+
+    watcher = make_watcher(puml, registry)
+    dirs = ', '.join(str(d) for d in registry.dirs if d.is_dir())
+    print(f"Watching {puml} and {dirs} ({type(watcher).__name__}), Ctrl+C to stop")
+    try:
+        while True:
+            changed = watcher.wait()
+            # an editor save is usually a burst of events, take them all
+            while True:
+                more = watcher.wait(WATCH_DEBOUNCE)
+                if not more:
+                    break
+                changed |= more
+
+            start = time.perf_counter()
+            try:
+                model_changed = puml in changed
+                # the registry compares mtimes, unrelated files change nothing
+                templates_changed = bool(changed - {puml}) and registry.refresh()
+                if not model_changed and not templates_changed:
+                    continue
+                if model_changed:
+                    entities, relations_raw = collect_model(parse_path(puml))
+                generate(project_root, base_pkg, entities, relations_raw, registry, use_lombok, jobs=jobs, force=force, cache=cache, write_threads=write_threads, fsync=fsync, seed_options=seed_options)
+            except Exception as e:
+                print("Error:", e)
+                continue
+            print(f"Regenerated in {(time.perf_counter() - start) * 1000:.0f} ms")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+# ------------------ Daemon mode ------------------
+
+DAEMON_HOST = '127.0.0.1'
+DAEMON_PORT = 8765
+DAEMON_EXCLUDE = (MANIFEST_DIR,)
+
+_pool_templates: Optional[Dict[str, str]] = None
+
+
+def _init_template_worker(templates: Dict[str, str]):
+    global _pool_templates
+    _pool_templates = templates
+
+
+def zip_files(files: Dict[str, bytes], prefix: str, exclude: Iterable[str] = DAEMON_EXCLUDE) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for rel in sorted(files):
+            if rel.split('/', 1)[0] not in exclude:
+                zf.writestr(f"{prefix}/{rel}", files[rel])
+    return buf.getvalue()
+
+
+def daemon_generate(request: Dict) -> Dict:
+    """
+    Runs one generation request inside a daemon worker. Writes into
+    request['output_dir'] when given (already checked against the output
+    root by the handler), otherwise generates in memory and returns the
+    project as zip.
+    """
+    timing = {}
+    start = time.perf_counter()
+    entities, relations_raw = parse(request['puml'])
+    timing['parse_ms'] = (time.perf_counter() - start) * 1000
+
+    out_dir = request.get('output_dir')
+    sink = DirectorySink(out_dir) if out_dir else MemorySink(request.get('artifact', 'project'))
+
+    start = time.perf_counter()
+    # without 'artifact' the pom is named after the directory (or 'project')
+    stats = generate_project(sink, request['base_package'], entities, relations_raw, _pool_templates,
+                             use_lombok=request.get('use_lombok', False), force=request.get('force', False),
+                             artifact=request.get('artifact'))
+    timing['generate_ms'] = (time.perf_counter() - start) * 1000
+
+    archive = None
+    if not out_dir:
+        start = time.perf_counter()
+        archive = zip_files(sink.files, sink.name)
+        timing['archive_ms'] = (time.perf_counter() - start) * 1000
+
+    return {
+        'written': stats.written,
+        'skipped': stats.skipped,
+        'deleted': stats.deleted,
+        'kept': stats.kept,
+        'log': report_lines(stats),
+        'timing': timing,
+        'archive': archive,
+    }
+
+
+def daemon_output_dir(output_dir, root: Optional[Path]) -> str:
+    """
+    Resolves a request's output_dir (relative paths are taken relative to
+    `root`). Raises ValueError unless the daemon has an output root and the
+    directory is inside it.
+    """
+    if root is None:
+        raise ValueError("'output_dir' needs a daemon started with --output-root")
+    if not isinstance(output_dir, str) or not output_dir:
+        raise ValueError("'output_dir' must be a non-empty string")
+    resolved = (root / output_dir).resolve()
+    if not resolved.is_relative_to(root):
+        raise ValueError(f"'output_dir' must be inside the output root {root}")
+    return str(resolved)
+
+
+def check_daemon_request(request, output_root: Optional[Path]) -> Dict:
+    """
+    Validates a /generate request body; raises ValueError with the message
+    for the 400 response. Returns the request with output_dir resolved.
+    """
+    if not isinstance(request, dict) or not isinstance(request.get('puml'), str) or not isinstance(request.get('base_package'), str):
+        raise ValueError("'puml' and 'base_package' are required")
+    if not isinstance(request.get('artifact', ''), str):
+        raise ValueError("'artifact' must be a string")
+    for key in ('use_lombok', 'force'):
+        if not isinstance(request.get(key, False), bool):
+            raise ValueError(f"'{key}' must be true or false")
+    if 'output_dir' in request:
+        request = dict(request, output_dir=daemon_output_dir(request['output_dir'], output_root))
+    return request
+
+
+class DaemonHandler(BaseHTTPRequestHandler):
+    """
+    POST /generate  JSON {puml, base_package, artifact?, use_lombok?, force?, output_dir?}
+                    -> application/zip (timing in X-Timing-* headers), or JSON when
+                       output_dir is given (only inside the daemon's --output-root)
+    GET  /health    -> {"status": "ok"}
+    """
+    server_version = 'ParserToolbox/1'
+
+    def address_string(self):
+        # Unix domain sockets have no (host, port) client address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else 'unix'
+
+    def _send_json(self, status: int, body: Dict):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if self.path != '/generate':
+            self._send_json(404, {'error': 'not found'})
+            return
+        start = time.perf_counter()
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = check_daemon_request(json.loads(self.rfile.read(length).decode('utf-8')), self.server.output_root)
+        except ValueError as e:
+            self._send_json(400, {'error': str(e)})
+            return
+
+        try:
+            result = self.server.pool.submit(daemon_generate, request).result()
+        except Exception as e:
+            self._send_json(500, {'error': str(e)})
+            return
+        result['timing']['total_ms'] = (time.perf_counter() - start) * 1000
+
+        archive = result.pop('archive')
+        if archive is None:
+            self._send_json(200, result)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/zip')
+        self.send_header('Content-Length', str(len(archive)))
+        for key, value in result['timing'].items():
+            self.send_header('X-Timing-' + key.replace('_', '-'), f"{value:.1f}")
+        self.send_header('X-Files-Written', str(result['written']))
+        self.end_headers()
+        self.wfile.write(archive)
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(registry: TemplateRegistry, host: str = DAEMON_HOST, port: int = DAEMON_PORT, socket_path: Optional[Path] = None, workers: int = 0, output_root: Optional[Path] = None):
+    """
+    Long-running generator service. Templates are loaded once and handed
+    to every worker process; each request is parsed and generated in the
+    process pool while the HTTP threads only do I/O. Requests may only
+    write below `output_root`, and not at all without one.
+    """
+    if socket_path is not None:
+        try:
+            mode = os.lstat(socket_path).st_mode
+        except FileNotFoundError:
+            mode = None
+        if mode is not None and not stat.S_ISSOCK(mode):
+            print("Error: --socket path exists and is not a socket:", socket_path)
+            sys.exit(1)
+    templates = registry.templates()
+    workers = workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_template_worker, initargs=(templates,))
+
+    if socket_path is not None:
+        # a stale socket of an earlier daemon, checked above
+        socket_path.unlink(missing_ok=True)
+        server = ThreadingUnixHTTPServer(str(socket_path), DaemonHandler)
+        where = f"unix:{socket_path}"
+    else:
+        server = ThreadingHTTPServer((host, port), DaemonHandler)
+        where = f"http://{host}:{server.server_address[1]}"
+    server.pool = pool
+    server.output_root = output_root.resolve() if output_root is not None else None
+
+    print(f"Serving on {where} with {workers} workers, Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.shutdown(cancel_futures=True)
+        if socket_path is not None and socket_path.is_socket():
+            socket_path.unlink()
+
+# ------------------ Batch mode ------------------
+
+# GenerateOptions fields a batch entry may set, with their JSON/TOML type.
+# jobs, cache_dir and templates have no per-project meaning in a batch.
+BATCH_OPTIONS = {
+    'artifact': str,
+    'use_lombok': bool,
+    'force': bool,
+    'seed': int,
+    'templates_dir': str,
+    'type_map': Dict[str, str],
+    'write_threads': int,
+    'fsync': bool,
+    'sql_batch_size': int,
+    'seed_rows': int,
+    'entity_seed_rows': Dict[str, int],
+    'seed_format': str,
+    'distribution': str,
+    'column_distributions': Dict[str, str],
+}
+BATCH_REQUIRED = ('input', 'output_dir', 'base_package')
+BATCH_TYPE_NAMES = {bool: 'true or false', int: 'an integer', str: 'a string'}
+
+
+def check_batch_value(key: str, value, kind):
+    """
+    Raises ValueError naming `key` unless `value` is of `kind` (str, int,
+    bool or Dict[str, ...], checked per item).
+    """
+    if get_origin(kind) is dict:
+        if not isinstance(value, dict):
+            raise ValueError(f"{key!r} must be a table")
+        for name, item in value.items():
+            check_batch_value(f"{key}.{name}", item, get_args(kind)[1])
+        return
+    # bool is an int, but true is not a row count
+    if not isinstance(value, kind) or (kind is int and isinstance(value, bool)):
+        raise ValueError(f"{key!r} must be {BATCH_TYPE_NAMES[kind]}")
+
+
+def batch_entry(project, base: Path) -> Dict:
+    """
+    One manifest entry as {input, output_dir, options}. Raises ValueError
+    for a malformed entry, unknown keys (typos would otherwise be ignored)
+    and values of the wrong type or range.
+    """
+    if not isinstance(project, dict):
+        raise ValueError("must be a table with input, output_dir and base_package")
+    missing = [k for k in BATCH_REQUIRED if k not in project]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    unknown = sorted(set(project) - set(BATCH_REQUIRED) - set(BATCH_OPTIONS))
+    if unknown:
+        raise ValueError(f"unknown key{'s' if len(unknown) > 1 else ''} {', '.join(map(repr, unknown))}")
+    for key in BATCH_REQUIRED:
+        check_batch_value(key, project[key], str)
+    fields = {}
+    for key, kind in BATCH_OPTIONS.items():
+        if key in project:
+            check_batch_value(key, project[key], kind)
+            fields[key] = project[key]
+    if 'templates_dir' in fields:
+        fields['templates_dir'] = base / fields['templates_dir']
+    options = GenerateOptions(project['base_package'], **fields)
+    # row counts, seed format and distributions are checked up front as well
+    options.seed_options()
+    return {'input': str(base / project['input']), 'output_dir': str(base / project['output_dir']), 'options': options}
+
+
+def load_batch_manifest(path: Path) -> List[Dict]:
+    """
+    Reads a JSON or TOML batch manifest: a list of projects, either at the
+    top level or under "projects" ([[projects]] tables in TOML). Each entry
+    has input, output_dir, base_package and optionally the GenerateOptions
+    fields in BATCH_OPTIONS. Relative paths are taken relative to the
+    manifest. A malformed entry gets an 'error' instead and fails on its
+    own; every entry has a 'name' for the summary.
+    """
+    if path.suffix.lower() == '.toml':
+        if tomllib is None:
+            raise ValueError('TOML manifests need Python 3.11+ (tomllib)')
+        with open(path, 'rb') as f:
+            data = tomllib.load(f)
+    else:
+        data = json.loads(path.read_text(encoding='utf-8'))
+
+    projects = data.get('projects', []) if isinstance(data, dict) else data
+    if not isinstance(projects, list):
+        raise ValueError('expected a list of projects')
+    base = path.parent
+    entries = []
+    for i, p in enumerate(projects, 1):
+        try:
+            entry = batch_entry(p, base)
+            entry['name'] = entry['output_dir']
+        except ValueError as e:
+            entry = {'name': f"project #{i}", 'error': str(e)}
+        entries.append(entry)
+    return entries
+
+
+def batch_generate(entry: Dict, templates: Optional[Dict[str, object]] = None) -> Dict:
+    """
+    Parses and generates one batch entry in a worker, with `templates` or
+    else the ones the pool was started with. Errors are returned, not
+    raised, so one broken project does not stop the others.
+    """
+    timing = {}
+    try:
+        start = time.perf_counter()
+        # as_model() rejects a PUML without classes or relations
+        entities, relations_raw = as_model(Path(entry['input']))
+        timing['parse_ms'] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        options = replace(entry['options'], templates=templates or _pool_templates, templates_dir=None)
+        stats = generate_model((entities, relations_raw), options, Path(entry['output_dir']))
+        timing['generate_ms'] = (time.perf_counter() - start) * 1000
+    except Exception as e:
+        return {'error': f"{type(e).__name__}: {e}", 'timing': timing}
+    return {'written': stats.written, 'skipped': stats.skipped, 'timing': timing}
+
+
+def batch_templates(entries: List[Dict], override: Optional[Path] = None, cache_dir: Optional[Path] = None) -> Tuple[Dict[str, object], List[Optional[Dict[str, object]]]]:
+    """
+    Loads the templates once for the whole batch, plus once per input
+    directory that has its own .parser-toolbox/templates and per entry
+    templates_dir (which takes the place of `override`). Returns the shared
+    templates and, per entry, its own templates or None for the shared.
+    """
+    templates = TemplateRegistry(template_dirs(override=override), cache_dir).templates()
+    by_dirs = {}
+    per_entry = []
+    for entry in entries:
+        if 'error' in entry:
+            per_entry.append(None)
+            continue
+        puml = Path(entry['input'])
+        project_dir = puml.resolve().parent / PROJECT_TEMPLATES_DIR
+        entry_override = entry['options'].templates_dir
+        if not project_dir.is_dir() and entry_override is None:
+            per_entry.append(None)
+            continue
+        dirs = tuple(template_dirs(puml, entry_override or override))
+        if dirs not in by_dirs:
+            by_dirs[dirs] = TemplateRegistry(dirs, cache_dir).templates()
+        per_entry.append(by_dirs[dirs])
+    return templates, per_entry
+
+
+def run_batch(entries: List[Dict], templates: Optional[Path] = None, jobs: int = 0, cache_dir: Optional[Path] = None) -> int:
+    """
+    Generates all entries with templates loaded once (the same layers as a
+    single run: .parser-toolbox/templates next to each input, then
+    `templates`), spread over a process pool. Prints a per-project and total
+    summary; returns the failure count.
+    """
+    shared, per_entry = batch_templates(entries, templates, cache_dir)
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(entries)))
+    start = time.perf_counter()
+    failed = 0
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_template_worker, initargs=(shared,)) as pool:
+        # entries the manifest check rejected are not submitted
+        futures = [None if 'error' in entry else pool.submit(batch_generate, entry, project)
+                   for entry, project in zip(entries, per_entry)]
+        for entry, future in zip(entries, futures):
+            try:
+                result = future.result() if future is not None else {'error': entry['error'], 'timing': {}}
+            except Exception as e:
+                result = {'error': f"{type(e).__name__}: {e}", 'timing': {}}
+            timing = result['timing']
+            ms = sum(timing.values())
+            if 'error' in result:
+                failed += 1
+                print(f"FAILED {entry['name']} ({ms:.0f} ms): {result['error']}")
+            else:
+                print(f"ok     {entry['name']} ({ms:.0f} ms: parse {timing['parse_ms']:.0f}, "
+                      f"generate {timing['generate_ms']:.0f}; {result['written']} written, {result['skipped']} skipped)")
+
+    total = time.perf_counter() - start
+    print(f"{len(entries) - failed}/{len(entries)} projects generated in {total:.2f} s with {jobs} workers")
+    return failed
+
+# ------------------ CLI ------------------
+
+USAGE = '''Usage: python puml_to_quarkus_generator.py input.puml output_dir base.package [--lombok] [--jobs N] [--force] [--no-cache] [--write-threads N] [--fsync] [--sql-batch-size N] [--seed-rows N|Entity=N] [--seed-format sql|csv|copy] [--seed N] [--distribution [Entity.attr=]uniform|normal|zipf[:S]] [--templates DIR] [--archive out.zip|out.tar.gz]
+       python puml_to_quarkus_generator.py watch input.puml output_dir base.package [--lombok] [--jobs N] [--force] [--no-cache] [--write-threads N] [--fsync] [--sql-batch-size N] [--seed-rows N|Entity=N] [--seed-format sql|csv|copy] [--seed N] [--distribution [Entity.attr=]D] [--templates DIR]
+       python puml_to_quarkus_generator.py serve [--host H] [--port P | --socket PATH] [--workers N] [--output-root DIR] [--templates DIR]
+       python puml_to_quarkus_generator.py batch manifest.json|manifest.toml [--jobs N] [--templates DIR]'''
+
+
+def parse_cli(args: List[str]) -> Tuple[Path, Path, str, Dict]:
+    if len(args) < 3:
+        print(USAGE)
+        sys.exit(1)
+
+    puml = Path(args[0])
+    out = Path(args[1])
+    base_pkg = args[2]
+
+    options = {'use_lombok': False, 'jobs': 1, 'force': False, 'cache': True, 'write_threads': 1, 'fsync': False, 'archive': None, 'templates': None}
+    seed = {}
+    entity_rows = {}
+    column_distributions = {}
+    opts = args[3:]
+    while opts:
+        opt = opts.pop(0)
+        if opt == "--lombok":
+            options['use_lombok'] = True
+        elif opt == "--jobs" and opts and opts[0].isdigit():
+            options['jobs'] = int(opts.pop(0))
+        elif opt == "--force":
+            options['force'] = True
+        elif opt == "--no-cache":
+            options['cache'] = False
+        elif opt == "--write-threads" and opts and opts[0].isdigit() and int(opts[0]) > 0:
+            options['write_threads'] = int(opts.pop(0))
+        elif opt == "--fsync":
+            options['fsync'] = True
+        elif opt == "--sql-batch-size" and opts and opts[0].isdigit() and int(opts[0]) > 0:
+            seed['batch_size'] = int(opts.pop(0))
+        elif opt == "--seed-rows" and opts:
+            # --seed-rows 1000 for every entity, --seed-rows Order=50000 for one
+            ename, _, rows = opts.pop(0).rpartition('=')
+            if not rows.isdigit() or int(rows) < 1:
+                print("Error: --seed-rows needs N or Entity=N with N >= 1")
+                sys.exit(1)
+            if ename:
+                entity_rows[ename] = int(rows)
+            else:
+                seed['rows'] = int(rows)
+        elif opt == "--seed-format" and opts and opts[0] in SEED_FORMATS:
+            seed['format'] = opts.pop(0)
+        elif opt == "--seed" and opts and opts[0].isdigit():
+            seed['seed'] = int(opts.pop(0))
+        elif opt == "--distribution" and opts:
+            # --distribution normal for every numeric column, --distribution Order.customer_id=zipf:1.2 for one
+            column, _, spec = opts.pop(0).rpartition('=')
+            if column:
+                column_distributions[column] = spec
+            else:
+                seed['distribution'] = spec
+        elif opt == "--templates" and opts:
+            options['templates'] = Path(opts.pop(0))
+        elif opt == "--archive" and opts:
+            options['archive'] = Path(opts.pop(0))
+            if archive_format(options['archive']) is None:
+                print("Error: --archive needs a .zip, .tar.gz, .tgz or .tar file:", options['archive'])
+                sys.exit(1)
+        else:
+            print("Error: Unknown option:", opt)
+            print(USAGE)
+            sys.exit(1)
+
+    if not puml.exists():
+        print('Input PUML not found:', puml)
+        sys.exit(1)
+
+    try:
+        options['seed_options'] = SeedOptions(**seed, entity_rows=tuple(sorted(entity_rows.items())),
+                                              column_distributions=tuple(sorted(column_distributions.items())))
+    except ValueError as e:
+        print("Error:", e)
+        sys.exit(1)
+    return puml, out, base_pkg, options
+
+
+def parse_serve_cli(args: List[str]) -> Dict:
+    options = {'host': DAEMON_HOST, 'port': DAEMON_PORT, 'socket_path': None, 'workers': 0, 'output_root': None, 'templates': None}
+    while args:
+        opt = args.pop(0)
+        if opt == "--host" and args:
+            options['host'] = args.pop(0)
+        elif opt == "--port" and args and args[0].isdigit():
+            options['port'] = int(args.pop(0))
+        elif opt == "--socket" and args:
+            options['socket_path'] = Path(args.pop(0))
+        elif opt == "--workers" and args and args[0].isdigit():
+            options['workers'] = int(args.pop(0))
+        elif opt == "--output-root" and args:
+            options['output_root'] = Path(args.pop(0))
+        elif opt == "--templates" and args:
+            options['templates'] = Path(args.pop(0))
+        else:
+            print("Error: Unknown option:", opt)
+            print(USAGE)
+            sys.exit(1)
+    return options
+
+
+def main():
+    # Expected:
+    # python puml_to_quarkus_generator.py [watch] input.puml output_dir base.package [--lombok] [--jobs N] [--force] [--no-cache] [--write-threads N] [--fsync] [--sql-batch-size N] [--seed-rows N|Entity=N] [--seed-format F] [--seed N] [--distribution D] [--templates DIR] [--archive FILE]
+    # python puml_to_quarkus_generator.py serve [--host H] [--port P | --socket PATH] [--workers N] [--output-root DIR] [--templates DIR]
+    # python puml_to_quarkus_generator.py batch manifest.json|manifest.toml [--jobs N] [--templates DIR]
+
+    args = sys.argv[1:]
+    command = None
+    if args and args[0] in ('watch', 'serve', 'batch'):
+        command = args.pop(0)
+
+    if command == 'batch':
+        if not args:
+            print(USAGE)
+            sys.exit(1)
+        manifest = Path(args.pop(0))
+        jobs, templates = 0, None
+        while args:
+            opt = args.pop(0)
+            if opt == "--jobs" and args and args[0].isdigit():
+                jobs = int(args.pop(0))
+            elif opt == "--templates" and args:
+                templates = Path(args.pop(0))
+            else:
+                print(USAGE)
+                sys.exit(1)
+        try:
+            entries = load_batch_manifest(manifest)
+        except (OSError, ValueError) as e:
+            print('Error: cannot read batch manifest:', e)
+            sys.exit(1)
+        failed = run_batch(entries, templates, jobs=jobs, cache_dir=template_cache_dir())
+        sys.exit(1 if failed else 0)
+
+    if command == 'serve':
+        options = parse_serve_cli(args)
+        serve(TemplateRegistry(template_dirs(override=options.pop('templates')), template_cache_dir()), **options)
+        return
+
+    puml, out, base_pkg, options = parse_cli(args)
+    registry = TemplateRegistry(template_dirs(puml, options.pop('templates')), template_cache_dir() if options['cache'] else None)
+    archive = options.pop('archive')
+
+    if command == 'watch':
+        if archive is not None:
+            print("Error: --archive cannot be used with watch")
+            sys.exit(1)
+        watch(puml, out, base_pkg, registry, **options)
+        return
+
+    entities, relations_raw = collect_model(parse_path(puml))
+
+    if archive is not None:
+        # output_dir only names the project folder inside the archive
+        with ArchiveSink(archive, out.name) as sink:
+            generate(sink, base_pkg, entities, relations_raw, registry, **options)
+    else:
+        generate(out, base_pkg, entities, relations_raw, registry, **options)
+
+    if options['use_lombok']:
+        print("Project generated with Lombok support")
+    else:
+        print("Project generated without Lombok (classic getters/setters)")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except TemplateError as e:
+        print('Error: invalid template:', e)
+        sys.exit(1)
@@ -0,0 +1,68 @@
+"""
+Importable API of the PUML -> Quarkus generator.
+
+    import parser_toolbox
+
+    options = parser_toolbox.GenerateOptions(base_package='com.example', seed=42)
+    stats = parser_toolbox.generate(puml_text, options, 'out/my-app')
+
+Nothing here prints, exits, touches the global `random` state or writes
+outside the given output directory or sink; a MemorySink keeps the
+project in memory:
+
+    sink = parser_toolbox.MemorySink('my-app')
+    parser_toolbox.generate(puml_text, options, sink)
+    sink.files['README.md']
+"""
+
+from parser import (
+    Attribute,
+    DirectorySink,
+    Entity,
+    GenerateOptions,
+    MemorySink,
+    ModelDiff,
+    OutputSink,
+    RawRelation,
+    ResolvedModel,
+    ResolvedRelation,
+    WriteStats,
+    default_templates,
+    generate_model,
+    parse,
+    parse_path,
+    parse_stream,
+    read_templates,
+    resolve,
+)
+
+__all__ = [
+    'Attribute',
+    'DirectorySink',
+    'Entity',
+    'GenerateOptions',
+    'MemorySink',
+    'ModelDiff',
+    'OutputSink',
+    'RawRelation',
+    'ResolvedModel',
+    'ResolvedRelation',
+    'WriteStats',
+    'default_templates',
+    'generate',
+    'parse',
+    'parse_path',
+    'parse_stream',
+    'read_templates',
+    'resolve',
+]
+
+
+def generate(model_or_text, options: GenerateOptions, sink) -> WriteStats:
+    """
+    `model_or_text` is PUML text (str), a path to a PUML file
+    (os.PathLike, e.g. pathlib.Path; a str is never taken as a path) or an
+    (entities, relations) pair; `sink` is an OutputSink or the output
+    directory. Raises ValueError if the PUML declares no classes or relations.
+    """
+    return generate_model(model_or_text, options, sink)
@@ -0,0 +1,4 @@
+
+public {type} get{cap}() {{ return {name}; }}
+public void set{cap}({type} {name}) {{ this.{name} = {name}; }}
+
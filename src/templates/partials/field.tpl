@@ -0,0 +1 @@
+    private {type} {name};
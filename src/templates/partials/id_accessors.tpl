@@ -0,0 +1,4 @@
+
+public Long getId() {{ return id; }}
+public void setId(Long id) {{ this.id = id; }}
+
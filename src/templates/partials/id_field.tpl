@@ -0,0 +1,3 @@
+    @Id
+    @GeneratedValue
+    private Long id;
@@ -0,0 +1,29 @@
+{% if type == "OneToMany" %}
+
+@JsonIgnore
+@OneToMany(mappedBy = "{mapped_by}")
+private Set<{target}> {name} = new HashSet<>();
+{% elif type == "ManyToOne" %}
+
+@JsonIgnore
+@ManyToOne
+@JoinColumn(name = "{join_column}")
+private {target} {name};
+{% elif type == "ManyToMany" %}
+{% if join_table %}
+
+@JsonIgnore
+@ManyToMany
+@JoinTable(
+    name = "{join_table.name}",
+    joinColumns = @JoinColumn(name = "{join_table.join_column}"),
+    inverseJoinColumns = @JoinColumn(name = "{join_table.inverse_join_column}")
+)
+private Set<{target}> {name} = new HashSet<>();
+{% else %}
+
+@JsonIgnore
+@ManyToMany(mappedBy = "{mapped_by}")
+private Set<{target}> {name} = new HashSet<>();
+{% endif %}
+{% endif %}
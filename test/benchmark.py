@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Micro benchmarks for the PUML -> Quarkus generator.
+
+python benchmark.py [name ...]
+"""
+
+from contextlib import redirect_stdout
+from pathlib import Path
+import io
+import os
+import sys
+import tempfile
+import textwrap
+import time
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+import parser as gen  # noqa: E402
+
+TPL_DIR = Path(gen.__file__).parent / 'templates'
+
+
+# ------------------ Synthetic models ------------------
+
+def synthetic_model(n_entities: int, n_relations: int):
+    entities = {}
+    for i in range(n_entities):
+        name = f"E{i}"
+        entities[name] = gen.Entity(name, (
+            gen.Attribute('id', 'Long'),
+            gen.Attribute('name', 'String'),
+            gen.Attribute('amount', 'int'),
+            gen.Attribute('price', 'double'),
+        ))
+
+    tokens = [('||', 'o{'), ('}o', '||'), ('}o', 'o{'), ('||', '||')]
+    relations = []
+    for j in range(n_relations):
+        left = f"E{j % n_entities}"
+        right = f"E{(j * 7 + 1) % n_entities}"
+        lt, rt = tokens[j % len(tokens)]
+        relations.append(gen.RawRelation(left, lt, right, rt))
+    return entities, relations
+
+
+def timed(fn) -> float:
+    t = time.perf_counter()
+    fn()
+    return time.perf_counter() - t
+
+
+# ------------------ Benchmarks ------------------
+
+def bench_render():
+    """
+    Resolves and renders every entity of models with 4 relations per entity,
+    up to 5,000 entities / 20,000 relations. Time per entity should stay flat.
+    """
+    print("entities  relations  resolve[s]  render[s]  per-entity[us]")
+    for n in (625, 1250, 2500, 5000):
+        entities, raw = synthetic_model(n, 4 * n)
+        model = None
+
+        def resolve():
+            nonlocal model
+            model = gen.resolve(entities, raw)
+
+        def render():
+            for rent in model.entities.values():
+                gen.render_entity('com.example', rent, gen.DEFAULT_ENTITY_TPL)
+
+        t_resolve = timed(resolve)
+        t_render = timed(render)
+        print(f"{n:8d}  {4 * n:9d}  {t_resolve:10.3f}  {t_render:9.3f}  {t_render / n * 1e6:14.1f}")
+
+
+def bench_incremental():
+    """
+    Generates a 3,000-entity project, then changes one leaf entity and
+    regenerates. Only that entity's files and import.sql should be written.
+    """
+    n = 3000
+    entities, raw = synthetic_model(n, 4 * n)
+    leaf = gen.Entity('Leaf', (gen.Attribute('id', 'Long'), gen.Attribute('name', 'String')))
+    entities['Leaf'] = leaf
+    raw.append(gen.RawRelation('E0', '||', 'Leaf', 'o{'))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp) / 'project'
+
+        def run():
+            with redirect_stdout(io.StringIO()):
+                return gen.generate(out, 'com.example', entities, raw, gen.TemplateRegistry([TPL_DIR]), use_lombok=False)
+
+        t_full = timed(run)
+        entities['Leaf'] = gen.Entity('Leaf', leaf.attrs + (gen.Attribute('size', 'int'),))
+        stats = None
+
+        def rerun():
+            nonlocal stats
+            stats = run()
+
+        t_inc = timed(rerun)
+        print(f"full generation      : {t_full:8.3f} s")
+        print(f"one leaf entity edit : {t_inc * 1000:8.1f} ms, {stats.written} files written, {stats.skipped} skipped")
+
+
+def dedent_accessors(attrs):
+    """
+    The former per-attribute path: a type map built per attribute and a
+    textwrap.dedent() on a fresh f-string for every getter/setter.
+    """
+    out = []
+    for attr in attrs:
+        jmap = {"string": "String", "int": "Integer", "integer": "Integer", "long": "Long",
+                "double": "Double", "float": "Float", "boolean": "Boolean"}
+        jtype = jmap.get(attr.type.lower(), attr.type)
+        cap = attr.name[0].upper() + attr.name[1:]
+        out.append(f"    private {jtype} {attr.name};")
+        out.append(textwrap.dedent(f"""
+            public {jtype} get{cap}() {{ return {attr.name}; }}
+            public void set{cap}({jtype} {attr.name}) {{ this.{attr.name} = {attr.name}; }}
+        """))
+    return out
+
+
+def bench_attributes():
+    """
+    Renders one entity with 2,000 attributes and reports the cost per
+    attribute of the precompiled snippets, next to the former dedent path.
+    """
+    n, rounds = 2000, 20
+    types = ('String', 'int', 'long', 'double', 'boolean', 'LocalDate')
+    attrs = (gen.Attribute('id', 'Long'),) + tuple(gen.Attribute(f"field{i}", types[i % len(types)]) for i in range(n))
+    model = gen.resolve({'Wide': gen.Entity('Wide', attrs)}, [])
+    rent = model.entities['Wide']
+    tpl = gen.compile_template(gen.DEFAULT_ENTITY_TPL)
+    gen.default_partials()
+
+    print("path                 total[ms]  per-attribute[us]")
+    for label, fn in (
+        ('dedent (former)', lambda: dedent_accessors(attrs)),
+        ('snippets', lambda: gen.render_entity('com.example', rent, tpl)),
+        ('snippets, lombok', lambda: gen.render_entity('com.example', rent, tpl, use_lombok=True)),
+    ):
+        t = min(timed(fn) for _ in range(rounds))
+        print(f"{label:18s}  {t * 1000:10.2f}  {t / n * 1e6:17.2f}")
+
+
+def bench_writer():
+    """
+    Generates a 1,000-entity project into a fresh directory with the serial
+    writer and with the writer thread pool, with and without the final
+    group fsync. Set BENCH_DIR to a network mount to see the latency effect.
+    """
+    n = 1000
+    entities, raw = synthetic_model(n, 4 * n)
+    templates = gen.default_templates()
+    gen.generate_project(gen.MemorySink(), 'com.example', entities, raw, templates)
+
+    print("writer              fsync  total[s]  files/s")
+    with tempfile.TemporaryDirectory(dir=os.environ.get('BENCH_DIR')) as tmp:
+        for i, (label, threads, fsync) in enumerate((
+            ('serial', 1, False),
+            (f"{gen.WRITE_THREADS} threads", gen.WRITE_THREADS, False),
+            ('serial', 1, True),
+            (f"{gen.WRITE_THREADS} threads", gen.WRITE_THREADS, True),
+        )):
+            out = Path(tmp) / f"project{i}"
+            stats = None
+
+            def run():
+                nonlocal stats
+                stats = gen.generate_project(out, 'com.example', entities, raw, templates, write_threads=threads, fsync=fsync)
+
+            t = timed(run)
+            print(f"{label:18s}  {'yes' if fsync else 'no':5s}  {t:8.3f}  {stats.written / t:7.0f}")
+
+
+def bench_seed():
+    """
+    Streams import.sql for 10 entities with up to 100,000 rows each into a
+    file. Peak memory (a second, traced run) should stay flat while the
+    row count grows.
+    """
+    entities, raw = synthetic_model(10, 10)
+    model = gen.resolve(entities, raw)
+
+    print("rows/entity  batch  total[s]  rows/s     file[MB]  peak[KB]")
+    with tempfile.TemporaryDirectory(dir=os.environ.get('BENCH_DIR')) as tmp:
+        sink = gen.DirectorySink(tmp)
+        for rows in (1_000, 10_000, 100_000):
+            options = gen.SeedOptions(batch_size=1000, rows=rows)
+
+            def run():
+                sink.write_stream('import.sql', gen.encode_lines(gen.iter_import_sql(model, options=options)))
+
+            t = timed(run)
+            tracemalloc.start()
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            size = sink.stat('import.sql')[0]
+            print(f"{rows:11d}  {options.batch_size:5d}  {t:8.2f}  {rows * 10 / t:9.0f}  {size / 1e6:8.1f}  {peak / 1024:8.0f}")
+
+
+def cell_by_cell(n: int, rng):
+    """
+    The former path: one randint / uniform call per cell on a shared random.Random.
+    """
+    return [rng.randint(1, 100) for _ in range(n)], [round(rng.uniform(1.0, 100.0), 2) for _ in range(n)]
+
+
+def bench_columns():
+    """
+    Generates 1,000,000 integer and float values per distribution with the
+    column engine (stdlib, and NumPy when installed) next to the former
+    cell-by-cell random calls.
+    """
+    import random
+    n = 1_000_000
+    backends = [('stdlib', False)] + ([('numpy', True)] if gen.numpy is not None else [])
+
+    print("engine            distribution  total[s]  per-value[ns]")
+    t = timed(lambda: cell_by_cell(n, random.Random(1)))
+    print(f"{'cell by cell':16s}  {'uniform':12s}  {t:8.2f}  {t / (2 * n) * 1e9:13.0f}")
+    for label, use_numpy in backends:
+        for spec in ('uniform', 'normal', 'zipf'):
+            engine = gen.ColumnEngine(1, use_numpy=use_numpy)
+            t = timed(lambda: (engine.integers('t.i', 1, 100, n, spec), engine.floats('t.f', 1.0, 100.0, n, spec)))
+            print(f"{label:16s}  {spec:12s}  {t:8.2f}  {t / (2 * n) * 1e9:13.0f}")
+
+
+BENCHMARKS = {
+    'render': bench_render,
+    'incremental': bench_incremental,
+    'attributes': bench_attributes,
+    'writer': bench_writer,
+    'seed': bench_seed,
+    'columns': bench_columns,
+}
+
+
+def main():
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print('Unknown benchmark:', name, '- available:', ', '.join(BENCHMARKS))
+            sys.exit(1)
+        print(f"== {name}")
+        BENCHMARKS[name]()
+
+
+if __name__ == '__main__':
+    main()
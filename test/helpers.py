@@ -0,0 +1,27 @@
+"""
+Shared setup of the tests: puts src/ on sys.path (the generator is a
+script, not an installed package) and provides the common fixtures.
+"""
+
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+
+SRC = Path(__file__).resolve().parent.parent / 'src'
+PUML = Path(__file__).resolve().parent / 'test.puml'
+
+sys.path.insert(0, str(SRC))
+
+import parser as gen  # noqa: E402,F401
+
+
+class TempDirTestCase(unittest.TestCase):
+    """
+    A fresh temporary directory per test as `self.dir`.
+    """
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name).resolve()
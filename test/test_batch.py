@@ -0,0 +1,65 @@
+"""
+Tests for the batch manifest.
+
+python -m pytest test   or   python -m unittest discover test
+"""
+
+import json
+import unittest
+
+from helpers import TempDirTestCase, gen
+
+
+class BatchManifestTest(TempDirTestCase):
+
+    def load(self, *projects):
+        return self.load_raw([dict({'input': 'm.puml', 'output_dir': 'out', 'base_package': 'com.ex'}, **p) for p in projects])
+
+    def load_raw(self, projects):
+        manifest = self.dir / 'projects.json'
+        manifest.write_text(json.dumps({'projects': projects}))
+        return gen.load_batch_manifest(manifest)
+
+    def test_options_are_mapped(self):
+        entry, = self.load({'use_lombok': True, 'seed': 7, 'seed_rows': 100, 'seed_format': 'csv', 'templates_dir': 'tpl'})
+        self.assertEqual(entry['options'], gen.GenerateOptions('com.ex', use_lombok=True, seed=7, seed_rows=100, seed_format='csv',
+                                                               templates_dir=self.dir / 'tpl'))
+
+    def test_unknown_key_fails_only_its_entry(self):
+        ok, typo = self.load({}, {'use_lombock': True})
+        self.assertIn('options', ok)
+        self.assertEqual((typo['name'], typo['error']), ('project #2', "unknown key 'use_lombock'"))
+
+    def test_wrong_types_are_rejected(self):
+        for field, value, key in (('force', 'yes', 'force'), ('seed_rows', True, 'seed_rows'), ('seed_rows', '10', 'seed_rows'),
+                                  ('type_map', [], 'type_map'), ('entity_seed_rows', {'Plot': 'x'}, 'entity_seed_rows.Plot'),
+                                  ('column_distributions', {'Plot.width': 1}, 'column_distributions.Plot.width'),
+                                  ('input', 3, 'input'), ('output_dir', None, 'output_dir')):
+            with self.subTest(field=field, value=value):
+                entry, = self.load({field: value})
+                self.assertIn(repr(key), entry['error'])
+
+    def test_invalid_seed_options_are_rejected(self):
+        for field, value in (('seed_rows', 0), ('entity_seed_rows', {'Plot': 0}), ('seed_format', 'xml')):
+            with self.subTest(field=field):
+                entry, = self.load({field: value})
+                self.assertIn('error', entry)
+
+    def test_malformed_entries(self):
+        not_a_table, missing = self.load_raw([1, {'input': 'm.puml'}])
+        self.assertIn('must be a table', not_a_table['error'])
+        self.assertEqual(missing['error'], 'missing output_dir, base_package')
+        manifest = self.dir / 'projects.json'
+        manifest.write_text('{"projects": {"input": "m.puml"}}')
+        with self.assertRaises(ValueError):
+            gen.load_batch_manifest(manifest)
+
+    def test_empty_model_fails(self):
+        (self.dir / 'm.puml').write_text('@startuml\n@enduml\n')
+        entry, = self.load({})
+        result = gen.batch_generate(entry, gen.default_templates())
+        self.assertIn('no classes or relations', result['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
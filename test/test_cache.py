@@ -0,0 +1,59 @@
+"""
+Tests for the persistent render cache.
+
+python -m pytest test   or   python -m unittest discover test
+"""
+
+from unittest import mock
+import os
+import unittest
+
+from helpers import TempDirTestCase, gen
+
+
+class RenderCacheTest(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cache = gen.RenderCache(self.dir, max_bytes=10)
+
+    def test_hit_and_miss(self):
+        self.assertEqual(self.cache.get('t', 'f', lambda: 'abc'), b'abc')
+        self.assertEqual(self.cache.get('t', 'f', lambda: 'other'), b'abc')
+        self.assertEqual(self.cache.drain(), (1, 1))
+
+    def test_hit_on_entry_that_cannot_be_touched(self):
+        self.cache.get('t', 'f', lambda: 'abc')
+        with mock.patch('os.utime', side_effect=PermissionError('not the owner')):
+            self.assertEqual(self.cache.get('t', 'f', lambda: 'other'), b'abc')
+
+    def test_unreadable_entry_is_rendered(self):
+        self.cache.get('t', 'f', lambda: 'abc')
+        with mock.patch('builtins.open', side_effect=PermissionError('not readable')):
+            self.assertEqual(self.cache.get('t', 'f', lambda: 'new'), b'new')
+
+    def test_prune_drops_oldest_entries(self):
+        for i in range(4):
+            self.cache.get('t', str(i), lambda: 'abcd')
+            path = self.cache._path('t', str(i))
+            os.utime(path, ns=(i, i))
+        self.cache.prune()
+        self.assertEqual([os.path.exists(self.cache._path('t', str(i))) for i in range(4)], [False, False, True, True])
+
+    def test_prune_skips_entries_removed_concurrently(self):
+        for i in range(4):
+            self.cache.get('t', str(i), lambda: 'abcd')
+        real_stat = os.DirEntry.stat
+
+        def stat(entry, *args, **kwargs):
+            if entry.path == self.cache._path('t', '0'):
+                raise FileNotFoundError(entry.path)
+            return real_stat(entry, *args, **kwargs)
+
+        with mock.patch.object(os.DirEntry, 'stat', stat), \
+                mock.patch('os.unlink', side_effect=PermissionError('shared cache')):
+            self.cache.prune()
+
+
+if __name__ == '__main__':
+    unittest.main()
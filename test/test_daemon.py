@@ -0,0 +1,55 @@
+"""
+Tests for the daemon's request checks.
+
+python -m pytest test   or   python -m unittest discover test
+"""
+
+import unittest
+
+from helpers import PUML, TempDirTestCase, gen
+
+
+class DaemonRequestTest(TempDirTestCase):
+
+    def check(self, root=None, **fields):
+        return gen.check_daemon_request(dict({'puml': '', 'base_package': 'com.ex'}, **fields), root)
+
+    def test_output_dir_needs_an_output_root(self):
+        with self.assertRaisesRegex(ValueError, '--output-root'):
+            self.check(output_dir=str(self.dir / 'app'))
+
+    def test_output_dir_is_resolved_inside_the_root(self):
+        self.assertEqual(self.check(self.dir, output_dir='app')['output_dir'], str(self.dir / 'app'))
+        self.assertEqual(self.check(self.dir, output_dir=str(self.dir / 'a/b'))['output_dir'], str(self.dir / 'a/b'))
+
+    def test_output_dir_outside_the_root_is_rejected(self):
+        for output_dir in ('../app', '/etc', 'a/../../app'):
+            with self.subTest(output_dir=output_dir), self.assertRaisesRegex(ValueError, 'inside the output root'):
+                self.check(self.dir, output_dir=output_dir)
+
+    def test_flags_must_be_json_booleans(self):
+        self.assertTrue(self.check(use_lombok=True, force=False)['use_lombok'])
+        for value in ('no', 'false', 0, 1, None):
+            with self.subTest(value=value), self.assertRaisesRegex(ValueError, 'true or false'):
+                self.check(use_lombok=value)
+
+
+
+class DaemonGenerateTest(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        gen._init_template_worker(gen.default_templates())
+        self.addCleanup(gen._init_template_worker, None)
+
+    def test_artifact_names_the_project_in_output_dir(self):
+        out = self.dir / 'y'
+        puml = PUML.read_text()
+        result = gen.daemon_generate({'puml': puml, 'base_package': 'com.ex', 'artifact': 'zz', 'output_dir': str(out)})
+        self.assertIn('<artifactId>zz</artifactId>', (out / 'pom.xml').read_text())
+        self.assertIsNone(result['archive'])
+        self.assertIn(f"Files written: {result['written']}, unchanged (skipped): 0, stale removed: 0", result['log'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+Regression tests for incremental generation (manifest + model diff).
+
+python -m pytest test   or   python -m unittest discover test
+"""
+
+import json
+import os
+import random
+import unittest
+
+from helpers import PUML, TempDirTestCase, gen
+
+PKG_REL = 'src/main/java/com/ex'
+
+
+class IncrementalTest(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.out = self.dir / 'project'
+        self.entities, self.relations = gen.collect_model(gen.parse_path(PUML))
+
+    def run_generator(self, **kwargs) -> gen.WriteStats:
+        return gen.generate_project(self.out, 'com.ex', self.entities, self.relations, gen.default_templates(),
+                                    rng=random.Random(1), **kwargs)
+
+    def test_unchanged_run_skips_everything(self):
+        first = self.run_generator()
+        second = self.run_generator()
+        self.assertEqual(second.written, 0)
+        self.assertEqual(second.skipped, first.written)
+        self.assertEqual(second.kept, [])
+
+    def test_deleted_file_is_restored(self):
+        self.run_generator()
+        plot = self.out / PKG_REL / 'entities' / 'Plot.java'
+        content = plot.read_bytes()
+        plot.unlink()
+
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs):
+                stats = self.run_generator(jobs=jobs)
+                self.assertEqual(stats.written, 1)
+                self.assertEqual(plot.read_bytes(), content)
+                plot.unlink()
+
+    def test_deleted_file_of_clean_entity_is_restored_by_the_pool(self):
+        # Plot and Garden are dirty, so the pool runs; PlotRepository.java
+        # is not rendered by the worker because the diff did not touch it
+        sink = gen.MemorySink('app')
+        gen.generate_project(sink, 'com.ex', self.entities, self.relations, gen.default_templates(), rng=random.Random(1))
+        rel = f"{PKG_REL}/repositories/PlotRepository.java"
+        content = sink.files[rel]
+        sink.delete(rel)
+
+        text = PUML.read_text().replace('height : Double', 'height : Double\n    depth : Double')
+        text = text.replace('address : String', 'address : String\n    city : String')
+        entities, relations = gen.parse(text)
+        stats = gen.generate_project(sink, 'com.ex', entities, relations, gen.default_templates(), rng=random.Random(1), jobs=2)
+        self.assertEqual(sink.files[rel], content)
+        self.assertLessEqual({'Plot', 'Garden'}, set(stats.diff.entities))
+        # Plot.java, Garden.java, import.sql and the restored repository
+        self.assertEqual(stats.written, 4)
+
+    def test_edited_file_is_reported_not_overwritten(self):
+        self.run_generator()
+        resource = self.out / PKG_REL / 'resources' / 'GardenResource.java'
+        with open(resource, 'a') as f:
+            f.write('// edit\n')
+        edited = resource.read_bytes()
+
+        stats = self.run_generator()
+        self.assertEqual(stats.kept, [f"{PKG_REL}/resources/GardenResource.java"])
+        self.assertEqual(resource.read_bytes(), edited)
+
+        stats = self.run_generator(force=True)
+        self.assertEqual(stats.kept, [])
+        self.assertNotEqual(resource.read_bytes(), edited)
+
+    def test_malformed_manifest_entries_are_dropped(self):
+        first = self.run_generator()
+        manifest = self.out / gen.MANIFEST_PATH
+        doc = json.loads(manifest.read_text())
+        doc['files']['README.md'] = {}
+        doc['files']['pom.xml']['size'] = 'big'
+        doc['files']['extra.txt'] = None
+        doc['model']['entities']['Plot'] = []
+        manifest.write_text(json.dumps(doc))
+
+        stats = self.run_generator()
+        # the files themselves are unchanged, so nothing is rewritten
+        self.assertEqual((stats.written, stats.skipped, stats.kept), (0, first.written, []))
+        self.assertIsNone(stats.diff)
+
+        for broken in ('[]', '{"version": 1, "files": [], "model": "x"}', '{"version": 1, "files": {"a": 1}}'):
+            with self.subTest(broken):
+                manifest.write_text(broken)
+                self.assertEqual(self.run_generator().kept, [])
+
+    def test_file_touched_without_change_is_skipped(self):
+        self.run_generator()
+        entity = self.out / PKG_REL / 'entities' / 'Garden.java'
+        os.utime(entity, ns=(0, 0))
+        stats = self.run_generator()
+        self.assertEqual(stats.written, 0)
+        self.assertEqual(stats.kept, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+"""
+Tests for the library API (parser_toolbox).
+
+python -m pytest test   or   python -m unittest discover test
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+import xml.dom.minidom
+
+from helpers import PUML, SRC, TempDirTestCase
+import parser_toolbox
+
+
+class GenerateInputTest(unittest.TestCase):
+
+    def generate(self, model_or_text) -> parser_toolbox.MemorySink:
+        sink = parser_toolbox.MemorySink('app')
+        parser_toolbox.generate(model_or_text, parser_toolbox.GenerateOptions('com.ex', seed=1), sink)
+        return sink
+
+    def test_path_and_text_give_the_same_project(self):
+        self.assertEqual(self.generate(PUML).files, self.generate(PUML.read_text()).files)
+
+    def test_str_path_is_rejected(self):
+        with self.assertRaisesRegex(ValueError, 'os.PathLike'):
+            self.generate(str(PUML))
+
+
+
+class CliParityTest(TempDirTestCase):
+
+    def test_library_output_matches_cli(self):
+        out = self.dir / 'app'
+        # no user config or cache dirs, only the templates shipped in src/templates
+        env = dict(os.environ, XDG_CONFIG_HOME=str(self.dir), XDG_CACHE_HOME=str(self.dir))
+        subprocess.run([sys.executable, str(SRC / 'parser.py'), str(PUML), str(out), 'com.ex', '--seed', '1', '--no-cache'],
+                       env=env, check=True, capture_output=True)
+        cli = {str(p.relative_to(out)).replace(os.sep, '/'): p.read_bytes()
+               for p in out.rglob('*') if p.is_file() and p.relative_to(out).parts[0] != '.parser-toolbox'}
+
+        for label, options in (('defaults', parser_toolbox.GenerateOptions('com.ex', seed=1)),
+                               ('templates_dir', parser_toolbox.GenerateOptions('com.ex', seed=1, templates_dir=SRC / 'templates'))):
+            with self.subTest(label):
+                sink = parser_toolbox.MemorySink('app')
+                parser_toolbox.generate(PUML, options, sink)
+                files = {rel: data for rel, data in sink.files.items() if not rel.startswith('.parser-toolbox/')}
+                self.assertEqual(files, cli)
+                xml.dom.minidom.parseString(files['pom.xml'])
+                self.assertTrue(files['src/main/java/com/ex/entities/Plot.java'].startswith(b'package '))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+Tests for the PUML tokenizer and parser.
+
+python -m pytest test   or   python -m unittest discover test
+"""
+
+import unittest
+
+from helpers import TempDirTestCase, gen
+
+
+def attrs(text: str):
+    entities, _ = gen.parse(text)
+    return {name: [(a.name, a.type) for a in e.attrs] for name, e in entities.items()}
+
+
+class TokenizerTest(unittest.TestCase):
+
+    def kinds(self, text: str):
+        return [t.kind for t in gen.tokenize(text.splitlines())]
+
+    def test_block_body(self):
+        self.assertEqual(self.kinds('@startuml\nentity A {\n  *id : Long\n  name\n}\n@enduml'),
+                         [gen.TOK_START, gen.TOK_ENTITY, gen.TOK_ATTR, gen.TOK_ATTR, gen.TOK_ENTITY_END, gen.TOK_END])
+
+    def test_brace_on_next_line(self):
+        self.assertEqual(attrs('entity A\n\n{\n  x : Long\n}'), {'A': [('x', 'Long')]})
+        self.assertEqual(attrs('entity A\n{ x : Long }'), {'A': [('x', 'Long')]})
+        # a header not followed by a body is no entity
+        self.assertEqual(attrs('entity A\nB -- C'), {})
+
+    def test_same_line_bodies(self):
+        self.assertEqual(attrs('class A { a: int }'), {'A': [('a', 'int')]})
+        self.assertEqual(attrs('class A { a: int } class B { b: int }'), {'A': [('a', 'int')], 'B': [('b', 'int')]})
+        self.assertEqual(attrs('class A {}\nclass B { }'), {'A': [], 'B': []})
+        entities, relations = gen.parse('class A { a: int } class B {} A --> B')
+        self.assertEqual(list(entities), ['A', 'B'])
+        self.assertEqual([(r.left, r.right) for r in relations], [('A', 'B')])
+
+    def test_block_comments(self):
+        text = "/' class Hidden { h: int } '/\n/'\nentity AlsoHidden {\n  x : Long\n}\n'/\nclass Shown { s: int }"
+        self.assertEqual(attrs(text), {'Shown': [('s', 'int')]})
+        self.assertEqual(self.kinds(text)[:6], [gen.TOK_COMMENT] * 6)
+
+    def test_line_comments(self):
+        text = "' class Quoted { q: int }\n// class Slashed { s: int }\nentity A {\n  // note\n  a : Long\n}"
+        self.assertEqual(attrs(text), {'A': [('a', 'Long')]})
+        self.assertEqual(self.kinds(text), [gen.TOK_COMMENT, gen.TOK_COMMENT, gen.TOK_ENTITY, gen.TOK_COMMENT,
+                                            gen.TOK_ATTR, gen.TOK_ENTITY_END])
+
+    def test_attribute_prefixes_and_default_type(self):
+        self.assertEqual(attrs('entity A {\n  *id : Long\n  +name\n  #-x : Integer\n}'),
+                         {'A': [('id', 'Long'), ('name', 'String'), ('x', 'Integer')]})
+
+    def test_relations(self):
+        _, relations = gen.parse('A }o--o{ B : has\nA }o--o| C\nA --> D : owns')
+        # as before the tokenizer, only the arrow form keeps its label
+        self.assertEqual([(r.left, r.left_token, r.right, r.right_token, r.label) for r in relations],
+                         [('A', '}o', 'B', 'o{', ''), ('A', '}o', 'C', 'o|', ''), ('A', '', 'D', '>', 'owns')])
+
+
+class ParsePathTest(TempDirTestCase):
+
+    def test_file_and_text_agree(self):
+        text = 'class A { a: int } class B { b: int }\nentity C\n{\n  c : Long\n}\nA }o--o{ C : has\n'
+        path = self.dir / 'm.puml'
+        path.write_text(text)
+        self.assertEqual(gen.collect_model(gen.parse_path(path)), gen.parse(text))
+
+
+if __name__ == '__main__':
+    unittest.main()
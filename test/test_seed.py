@@ -0,0 +1,152 @@
+"""
+Tests for the seed data (import.sql, csv and COPY files).
+
+python -m pytest test   or   python -m unittest discover test
+"""
+
+import unittest
+
+from helpers import PUML, gen
+
+CYCLE = '''
+class A {
+    *id : Long
+}
+class B {
+    *id : Long
+}
+class C {
+    *id : Long
+}
+class D {
+    *id : Long
+}
+A }o--o| B
+B }o--o| C
+C }o--o| A
+D }o--o| C
+'''
+
+
+def load_model(text=None):
+    entities, relations = gen.parse(text) if text is not None else gen.collect_model(gen.parse_path(PUML))
+    return gen.resolve(entities, relations)
+
+
+class SeedOptionsTest(unittest.TestCase):
+
+    def test_counts_below_one_are_rejected(self):
+        for kwargs in ({'rows': 0}, {'rows': -2}, {'batch_size': 0}, {'entity_rows': (('Customer', 0),)},
+                       {'rows': True}, {'entity_rows': (('Customer', 'x'),)}):
+            with self.subTest(**{k: repr(v) for k, v in kwargs.items()}), self.assertRaises(ValueError):
+                gen.SeedOptions(**kwargs)
+
+    def test_valid_counts(self):
+        options = gen.SeedOptions(batch_size=500, rows=3, entity_rows=(('Customer', 1),))
+        self.assertEqual((options.rows_for('Customer'), options.rows_for('Order')), (1, 3))
+
+
+class CsvTest(unittest.TestCase):
+
+    def test_quoting(self):
+        cases = [
+            (None, ''),
+            ('', '""'),
+            ('plain', 'plain'),
+            (42, '42'),
+            ('a,b', '"a,b"'),
+            ('say "hi"', '"say ""hi"""'),
+            ('two\nlines', '"two\nlines"'),
+            ('cr\r', '"cr\r"'),
+        ]
+        for value, expected in cases:
+            with self.subTest(value=value):
+                self.assertEqual(gen.csv_field(value), expected)
+
+    def test_lines(self):
+        self.assertEqual(list(gen.csv_lines([[1, None, ''], [2, 'x,y', 'q"']])), ['1,,""', '2,"x,y","q"""'])
+
+
+class SqlInsertsTest(unittest.TestCase):
+
+    def test_rows_are_batched(self):
+        rows = [[1, None], [2, "it's"], [3, 'x']]
+        self.assertEqual(list(gen.sql_inserts('t', ['a', 'b'], rows, 2)), [
+            "INSERT INTO t (a, b) VALUES (1, NULL), (2, 'it''s');",
+            "INSERT INTO t (a, b) VALUES (3, 'x');",
+        ])
+        self.assertEqual(len(list(gen.sql_inserts('t', ['a', 'b'], rows))), 3)
+        self.assertEqual(len(list(gen.sql_inserts('t', ['a', 'b'], rows, 10))), 1)
+        self.assertEqual(list(gen.sql_inserts('t', ['a'], [], 2)), [])
+
+    def test_import_sql_batches_join_tables(self):
+        sql = gen.generate_import_sql(load_model(), options=gen.SeedOptions(batch_size=2, rows=3, seed=1))
+        inserts = [line for line in sql.splitlines() if line.startswith('INSERT INTO')]
+        self.assertEqual(len(inserts), 8)
+        join = [line for line in inserts if line.startswith('INSERT INTO plot_vegetable ')]
+        self.assertEqual(join, [
+            'INSERT INTO plot_vegetable (plot_id, vegetable_id) VALUES (1, 1), (2, 2);',
+            'INSERT INTO plot_vegetable (plot_id, vegetable_id) VALUES (3, 3);',
+        ])
+
+
+class LoadOrderTest(unittest.TestCase):
+
+    def test_referenced_entity_comes_first(self):
+        self.assertEqual(gen.fk_order(load_model()), ['Garden', 'Plot', 'Vegetable'])
+
+    def test_cycle(self):
+        order = gen.fk_order(load_model(CYCLE))
+        # every entity exactly once; D after the C it points to
+        self.assertEqual(order, ['C', 'B', 'A', 'D'])
+
+    def test_seed_tables(self):
+        options = gen.SeedOptions(rows=3, entity_rows=(('Vegetable', 2),))
+        tables = gen.seed_tables(load_model(), options)
+        self.assertEqual([t.table for t in tables], ['garden', 'plot', 'vegetable', 'plot_vegetable'])
+        self.assertEqual(tables[-1].columns, ['plot_id', 'vegetable_id'])
+        engine = gen.seed_engine(gen.SeedOptions(seed=1))
+        counts = [len(list(t.rows(engine))) for t in tables]
+        # the join table gets as many rows as its smaller side
+        self.assertEqual(counts, [3, 3, 2, 2])
+        for table in tables:
+            for row in table.rows(engine):
+                self.assertEqual(len(row), len(table.columns))
+
+
+class DeterminismTest(unittest.TestCase):
+
+    def test_same_seed_same_columns(self):
+        for use_numpy in (True, False):
+            with self.subTest(use_numpy=use_numpy):
+                a, b = gen.ColumnEngine(7, use_numpy), gen.ColumnEngine(7, use_numpy)
+                for spec in ('uniform', 'normal', 'zipf', 'zipf:1'):
+                    ints = a.integers('t.c', 1, 100, 50, spec)
+                    self.assertEqual(ints, b.integers('t.c', 1, 100, 50, spec))
+                    self.assertTrue(all(1 <= v <= 100 for v in ints))
+                    floats = a.floats('t.f', 0.0, 10.0, 50, spec)
+                    self.assertEqual(floats, b.floats('t.f', 0.0, 10.0, 50, spec))
+                    self.assertTrue(all(0.0 <= v <= 10.0 for v in floats))
+                self.assertNotEqual(gen.ColumnEngine(8, use_numpy).integers('t.c', 1, 10 ** 6, 50),
+                                    gen.ColumnEngine(7, use_numpy).integers('t.c', 1, 10 ** 6, 50))
+
+    def test_columns_are_independent(self):
+        alone = gen.ColumnEngine(7).integers('t.b', 1, 10 ** 6, 20)
+        engine = gen.ColumnEngine(7)
+        engine.integers('t.a', 1, 10 ** 6, 20)
+        self.assertEqual(engine.integers('t.b', 1, 10 ** 6, 20), alone)
+
+    def test_seed_data_is_reproducible(self):
+        model = load_model()
+        options = gen.SeedOptions(rows=5, seed=3)
+        sql = gen.generate_import_sql(model, options=options)
+        self.assertEqual(gen.generate_import_sql(model, options=options), sql)
+        self.assertNotEqual(gen.generate_import_sql(model, options=gen.SeedOptions(rows=5, seed=4)), sql)
+        for table in gen.seed_tables(model, options):
+            with self.subTest(table=table.table):
+                self.assertEqual(list(gen.csv_lines(table.rows(gen.seed_engine(options)))),
+                                 list(gen.csv_lines(table.rows(gen.seed_engine(options)))))
+
+
+if __name__ == '__main__':
+    unittest.main()
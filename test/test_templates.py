@@ -0,0 +1,107 @@
+"""
+Tests for the templates and the template compiler.
+
+python -m pytest test   or   python -m unittest discover test
+"""
+
+from types import SimpleNamespace
+import unittest
+
+from helpers import SRC, gen
+
+SHIPPED = SRC / 'templates'
+
+
+class ShippedTemplatesTest(unittest.TestCase):
+
+    def test_shipped_files_match_the_defaults(self):
+        for key, (fname, default) in gen.TEMPLATE_FILES.items():
+            with self.subTest(fname):
+                self.assertEqual((SHIPPED / fname).read_text(), default)
+        for name, default in gen.DEFAULT_PARTIALS.items():
+            with self.subTest(name):
+                self.assertEqual((SHIPPED / gen.PARTIALS_DIR / f"{name}.tpl").read_text().removesuffix('\n'), default)
+
+    def test_registry_serves_the_defaults(self):
+        shipped = gen.TemplateRegistry([SHIPPED]).templates()
+        defaults = gen.TemplateRegistry([]).templates()
+        for key in gen.TEMPLATE_FILES:
+            with self.subTest(key):
+                self.assertEqual(gen.template_hash(shipped[key]), gen.template_hash(defaults[key]))
+
+
+
+class TemplateCompilerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.partials = {'item': gen.compile_template('<{label}>', 'item')}
+
+    def compile(self, source):
+        return gen.compile_template(source, 't', self.partials)
+
+    def test_placeholders(self):
+        tpl = self.compile('{a} {b.c!r} {n:>3} {{literal}}')
+        self.assertEqual(tpl.render(a='x', b=SimpleNamespace(c='y'), n=7), "x 'y'   7 {literal}")
+        self.assertEqual(tpl.placeholders, {'a', 'b', 'n'})
+
+    def test_if_elif_else(self):
+        tpl = self.compile('{% if n == 1 %}one{% elif n != 2 %}not two{% else %}two{% endif %}')
+        self.assertEqual([tpl.render(n=n) for n in (1, 2, 3)], ['one', 'two', 'not two'])
+        tpl = self.compile('{% if not flag %}off{% endif %}')
+        self.assertEqual((tpl.render(flag=False), tpl.render(flag=True)), ('off', ''))
+
+    def test_for(self):
+        tpl = self.compile('{% for x in xs %}{x.name},{% endfor %}')
+        self.assertEqual(tpl.render(xs=[SimpleNamespace(name='p'), SimpleNamespace(name='q')]), 'p,q,')
+        # the loop variable is not a placeholder of the template
+        self.assertEqual(tpl.placeholders, {'xs'})
+
+    def test_include_with(self):
+        tpl = self.compile('{% include "item" with label=x.name %}|{% include item %}')
+        self.assertEqual(tpl.render(x=SimpleNamespace(name='n'), label='L'), '<n>|<L>')
+
+    def test_block_override(self):
+        tpl = self.compile('[{% block item %}default {d}{% endblock %}][{% block other %}kept {v}{% endblock %}]')
+        self.assertEqual(tpl.render(label='L', v=1), '[<L>][kept 1]')
+        # the replaced default body does not add placeholders
+        self.assertEqual(tpl.placeholders, {'label', 'v'})
+
+    def test_tags_alone_on_a_line_take_the_line(self):
+        tpl = self.compile('a\n  {% for x in xs %}\n- {x}\n  {% endfor %}\nb\n')
+        self.assertEqual(tpl.render(xs=[1, 2]), 'a\n- 1\n- 2\nb\n')
+        # inline tags and includes keep their line
+        self.assertEqual(self.compile('x {% if a %}y{% endif %} z\n').render(a=True), 'x y z\n')
+        self.assertEqual(self.compile('a\n{% include "item" %}\nb').render(label='L'), 'a\n<L>\nb')
+
+    def test_rejected_placeholders(self):
+        for source in ('{a.__class__}', '{_private}', '{class}', '{a.for}', '{a[0]}', '{a:{b}}', '{a:>{w}}',
+                       '{% for x in a.__dict__ %}{% endfor %}', '{% if import %}{% endif %}'):
+            with self.subTest(source), self.assertRaisesRegex(gen.TemplateError, 'unsupported'):
+                self.compile(source)
+
+    def test_structure_errors(self):
+        for source, message in (('{% if a %}x', 'missing'), ('{% for x in xs %}', 'missing'), ('{% endif %}', 'unknown tag'),
+                                ('{% include "missing" %}', 'unknown partial'), ('{% while a %}', 'unknown tag')):
+            with self.subTest(source), self.assertRaisesRegex(gen.TemplateError, message):
+                self.compile(source)
+
+    def test_include_cycle(self):
+        with self.assertRaisesRegex(gen.TemplateError, 'include cycle a -> b -> a'):
+            gen.compile_partials({'a': 'A{% include "b" %}', 'b': 'B{% include "a" %}'})
+
+    def test_compiled_form_round_trips(self):
+        tpl = self.compile('{% for x in xs %}{% include "item" with label=x %}{% endfor %}')
+        self.assertEqual(gen.CompiledTemplate.loads(tpl.dumps()).render(xs=[1, 2]), '<1><2>')
+
+
+class TemplateErrorTest(unittest.TestCase):
+
+    def test_malformed_tags_raise_template_error(self):
+        partials = {'p': gen.compile_template('{a}', 'p')}
+        for source in ('{% if x == "\\" %}a{% endif %}', '{% include "p" with for=x %}'):
+            with self.subTest(source), self.assertRaises(gen.TemplateError):
+                gen.compile_template(source, 't', partials)
+
+
+if __name__ == '__main__':
+    unittest.main()
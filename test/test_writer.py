@@ -0,0 +1,49 @@
+"""
+Tests for the threaded writer.
+
+python -m pytest test   or   python -m unittest discover test
+"""
+
+import random
+import threading
+import unittest
+
+from helpers import PUML, TempDirTestCase, gen
+
+
+class FailingRandom(random.Random):
+
+    def getrandbits(self, k):
+        raise RuntimeError('seed data failed')
+
+
+def writer_threads():
+    return [t for t in threading.enumerate() if t.name.startswith('writer')]
+
+
+class ConcurrentWriterTest(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.entities, self.relations = gen.collect_model(gen.parse_path(PUML))
+
+    def generate(self, sink, write_threads, rng=None) -> gen.WriteStats:
+        return gen.generate_project(sink, 'com.ex', self.entities, self.relations, gen.default_templates(),
+                                    rng=rng or random.Random(1), write_threads=write_threads)
+
+    def test_threaded_and_serial_write_the_same_files(self):
+        serial, threaded = self.dir / 'serial' / 'app', self.dir / 'threaded' / 'app'
+        self.assertEqual(self.generate(threaded, 4).written, self.generate(serial, 1).written)
+        for path in serial.rglob('*'):
+            if path.is_file() and gen.MANIFEST_DIR not in path.parts:
+                self.assertEqual(path.read_bytes(), (threaded / path.relative_to(serial)).read_bytes())
+
+    def test_failed_run_shuts_the_pool_down(self):
+        # import.sql is rendered after the entity files were queued
+        with self.assertRaisesRegex(RuntimeError, 'seed data failed'):
+            self.generate(self.dir / 'out', 4, FailingRandom())
+        self.assertEqual(writer_threads(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()